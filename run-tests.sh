@@ -36,5 +36,5 @@ echo "Running pytest (including integration tests)..."
 export POTATO_IT_ENABLE=${POTATO_IT_ENABLE:-1}
 export RUN_INTEGRATION_TESTS=${RUN_INTEGRATION_TESTS:-1}
 
-# Run full suite
-python -m pytest -q "$@"
+# Run full suite across all cores; loadfile keeps each module (and its shared container) on one worker
+python -m pytest -q -n auto --dist=loadfile "$@"
@@ -10,17 +10,27 @@ import time
 import uuid
 from os import PathLike
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import docker
 from docker.models.containers import Container
 
 logger = logging.getLogger(__name__)
 
+# One .env assignment: VAR=value, VAR="value", VAR='value', optionally prefixed by export.
+# A value wrapped in matching quotes is captured without them; anything else is taken as-is.
+_ENV_LINE = re.compile(r"""^(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)=\s*(?:"(.*)"|'(.*)'|(.*))$""")
+
+# env file path -> (st_mtime_ns, st_size, parsed vars); a changed stat re-parses the file
+_env_file_cache: dict[str, tuple[int, int, dict[str, str]]] = {}
+
 
 def validate_and_load_env_file(env_file_path: Path) -> dict[str, str]:
     """Validate and load environment variables from a .env file.
 
+    The parsed result is cached per path and reused while the file's mtime and size are
+    unchanged; callers get their own copy of the dict.
+
     Args:
     env_file_path: Path to the .env file
 
@@ -30,45 +40,36 @@ def validate_and_load_env_file(env_file_path: Path) -> dict[str, str]:
     Raises:
         ValueError: If the file contains invalid content (not just env vars)
     """
-    env_vars: dict[str, str] = {}
-
-    if not env_file_path.exists():
-        return env_vars
+    try:
+        st = env_file_path.stat()
+    except OSError:
+        return {}
+    key = str(env_file_path)
+    cached = _env_file_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return dict(cached[2])
 
-    content = env_file_path.read_text()
-    lines = content.strip().split('\n')
-
-    # Pattern for valid environment variable assignments
-    # Allows: VAR=value, VAR="value", VAR='value', export VAR=value
-    env_pattern = re.compile(r'^(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
-
-    for line_num, line in enumerate(lines, 1):
+    env_vars: dict[str, str] = {}
+    for line_num, line in enumerate(env_file_path.read_text().splitlines(), 1):
         line = line.strip()
 
         # Skip empty lines and comments
         if not line or line.startswith('#'):
             continue
-        
-        # Check if line matches environment variable pattern
-        match = env_pattern.match(line)
+
+        match = _ENV_LINE.match(line)
         if not match:
             raise ValueError(
                 f"Invalid content in {env_file_path} at line {line_num}: '{line}'\n"
                 f"Only environment variable assignments are allowed (e.g., VAR=value)"
             )
 
-        var_name = match.group(1)
-        var_value = match.group(2).strip()
+        # Exactly one of the value alternatives (double, single, unquoted) participates
+        name, *values = match.groups()
+        env_vars[name] = next(v for v in values if v is not None)
 
-        # Remove surrounding quotes if present
-        if var_value.startswith('"') and var_value.endswith('"'):
-            var_value = var_value[1:-1]
-        elif var_value.startswith("'") and var_value.endswith("'"):
-            var_value = var_value[1:-1]
-
-        env_vars[var_name] = var_value
-
-    return env_vars
+    _env_file_cache[key] = (st.st_mtime_ns, st.st_size, env_vars)
+    return dict(env_vars)
 
 
 class ContainerManager:
@@ -804,13 +805,10 @@ class ContainerManager:
         Returns:
             Script content as a string.
         """
-        lines: list[str] = ["#!/bin/bash", ""]
         # Avoid exporting any env vars here; inject via exec_run(environment=...)
-        lines.append(f"{command}")
         # Ensure a trailing newline
-        if not lines[-1].endswith("\n"):
-            lines[-1] = lines[-1] + "\n"
-        return "\n".join(lines)
+        newline = "" if command.endswith("\n") else "\n"
+        return f"#!/bin/bash\n\n{command}{newline}"
 
     def _compose_exec_env(self, extra_env: dict[str, str] | None = None) -> dict[str, str]:
         """Compose environment variables for container exec without persisting to disk.
@@ -903,6 +901,50 @@ class ContainerManager:
 
         return exit_code, output
 
+    def execute_argv(
+        self,
+        argv: list[str],
+        task_id: str,
+        *,
+        workdir: str | None = None,
+        extra_env: dict[str, str] | None = None,
+    ) -> tuple[int, str]:
+        """Execute an argv list in the container directly, without a shell or script file.
+
+        Args:
+            argv: Program and arguments; passed to exec as-is (no quoting needed)
+            task_id: Unique identifier for this task (used for logging only)
+            workdir: Optional working directory inside the container
+            extra_env: Optional environment overrides for this exec
+
+        Returns:
+            Tuple of (exit_code, output)
+        """
+        if not self.container:
+            raise RuntimeError("Container is not running")
+        if not argv:
+            raise ValueError("argv must not be empty")
+
+        logger.debug(f"[task={task_id}] exec argv={argv!r} workdir={workdir!r}")
+        kwargs: dict[str, Any] = {}
+        if workdir:
+            kwargs["workdir"] = workdir
+        exec_result = self.container.exec_run(
+            cmd=[str(a) for a in argv],
+            demux=True,
+            user="ubuntu",
+            environment=self._compose_exec_env(extra_env),
+            **kwargs,
+        )
+
+        stdout, stderr = exec_result.output
+        output = ""
+        if stdout:
+            output += stdout.decode("utf-8")
+        if stderr:
+            output += stderr.decode("utf-8")
+        return exec_result.exit_code, output
+
     # ---------------------------
     # Task lifecycle (background)
     # ---------------------------
@@ -1024,7 +1066,7 @@ class ContainerManager:
             raise RuntimeError("Container is not running")
         
         # Generate unique task ID
-        task_id = f"gh_list_{uuid.uuid4()}"
+        task_id = f"gh_list_{uuid.uuid4().hex}"
         
         # Build the gh repo list command
         if owner:
@@ -1052,7 +1094,7 @@ class ContainerManager:
             raise RuntimeError("Container is not running")
         
         # Generate unique task ID
-        task_id = f"gh_clone_{uuid.uuid4()}"
+        task_id = f"gh_clone_{uuid.uuid4().hex}"
         
         # Build the clone command - clone into workspace
         command = f"cd /workspace && gh repo clone {owner}/{repo}"
@@ -1069,7 +1111,7 @@ class ContainerManager:
                     f"{owner}/{repo}"
                     " --json description -q .description || true"
                 )
-                info_code, info_out = self.execute_command(info_cmd, f"info_{uuid.uuid4()}")
+                info_code, info_out = self.execute_command(info_cmd, f"info_{uuid.uuid4().hex}")
                 if info_code == 0 and info_out:
                     description = info_out.strip()
             except Exception:
@@ -1293,7 +1335,7 @@ class ContainerManager:
             else:
                 raise ValueError(f"Unsupported step type: {stype}")
 
-        task_id = f"pipeline_{uuid.uuid4()}"
+        task_id = f"pipeline_{uuid.uuid4().hex}"
         script_lines: list[str] = []
         # Do not export extra_env into the script to avoid persisting secrets; inject via exec env
         base_cwd = "/workspace"
@@ -3,10 +3,19 @@
 This server is hosted over MCP Streamable HTTP (Starlette/uvicorn), not stdio.
 """
 
+import fnmatch
+import functools
+import json
 import logging
 import os
+import posixpath
+import re
+import shlex
+import threading
+import time
 import uuid
-from typing import Any, Literal, no_type_check
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Literal, no_type_check
 
 from mcp.server import Server
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
@@ -18,6 +27,25 @@ from .web import record_tool_metric
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding for tool responses
+    orjson = None  # type: ignore[assignment]
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize a tool response payload to UTF-8 JSON text (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _loads(text: str | bytes) -> Any:
+    """Parse JSON text produced by container tools (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
 
 def _env_int(name: str, default: int) -> int:
     try:
@@ -32,6 +60,40 @@ def _env_str(name: str, default: str) -> str:
         return (v if v is not None else default).strip() or default
     except Exception:
         return default
+
+
+def _timeout_seconds(arguments: Any, default: int = 120) -> int:
+    """Tool 'timeout_seconds' argument as an int (default when missing or invalid)."""
+    if isinstance(arguments, dict):
+        try:
+            return int(arguments.get("timeout_seconds", default))
+        except Exception:
+            return default
+    return default
+
+
+def _count_arg(arguments: Any, key: str, default: int) -> int:
+    """Non-negative int tool argument; negatives clamp to 0, missing or invalid values give default."""
+    try:
+        return max(int(arguments.get(key, default)), 0)
+    except Exception:
+        return default
+
+
+# Task ids are uuid4().hex strings; they end up in file paths and shell commands
+_TASK_ID_RE = re.compile(r"[0-9a-f]+")
+
+
+def _task_id_arg(arguments: Any) -> str:
+    """Required 'task_id' tool argument, rejected unless it is a hex task id."""
+    task_id = arguments.get("task_id")
+    if not task_id:
+        raise ValueError("'task_id' is required")
+    if not isinstance(task_id, str) or not _TASK_ID_RE.fullmatch(task_id):
+        raise ValueError("'task_id' must be a hex task id as returned by the tool that started the task")
+    return task_id
+
+
 # ---------------------------
 # Pydantic models (typed schemas)
 # ---------------------------
@@ -129,6 +191,14 @@ def _schema(model: type[BaseModel]) -> dict:
 # ---------------------------
 # Exec helpers
 # ---------------------------
+# Shell command separators ('&&' / ';') used to split commands into simple steps
+_CMD_SEP_RE = re.compile(r"\s*(?:&&|;)\s*")
+# A leading 'cd <dir> && <rest>' prefix on a launch command
+_LEADING_CD_RE = re.compile(r"^\s*cd\s+(.+?)\s*&&\s*(.*)$")
+# Any 'git ... init' in a command; commands without one cannot run git init at all
+_GIT_INIT_HINT_RE = re.compile(r"\bgit\b.*?\binit\b", re.S)
+
+
 def _would_git_init_workspace_root(command: str) -> bool:
     """Heuristically detect if the provided shell command would execute
     'git init' at the workspace root (/workspace).
@@ -147,9 +217,10 @@ def _would_git_init_workspace_root(command: str) -> bool:
         if not isinstance(command, str) or not command.strip():
             return False
         s = command.strip()
-        import re as _re
-        import shlex as _sh
-        parts = [p.strip() for p in _re.split(r"\s*(?:&&|;)\s*", s) if p.strip()]
+        # Nearly every command has no 'git ... init'; skip the cwd simulation for those
+        if not _GIT_INIT_HINT_RE.search(s):
+            return False
+        parts = [p.strip() for p in _CMD_SEP_RE.split(s) if p.strip()]
         cwd: str | None = None
 
         def _norm(p: str | None) -> str | None:
@@ -182,7 +253,7 @@ def _would_git_init_workspace_root(command: str) -> bool:
 
             # Parse git invocations more precisely
             try:
-                toks = _sh.split(low)
+                toks = shlex.split(low)
             except Exception:
                 toks = low.split()
             if not toks:
@@ -246,12 +317,7 @@ def _exec_with_timeout(cmd: str, *, arguments: dict | None = None, extra_env: di
     arguments contains a numeric 'timeout_seconds'. If timed out, exit_code will
     be None and output may be empty.
     """
-    timeout_s = 120
-    if isinstance(arguments, dict):
-        try:
-            timeout_s = int(arguments.get("timeout_seconds", 120))
-        except Exception:
-            timeout_s = 120
+    timeout_s = _timeout_seconds(arguments)
 
     # Run in a worker thread so we can implement a join timeout
     result: dict[str, Any] = {}
@@ -259,17 +325,16 @@ def _exec_with_timeout(cmd: str, *, arguments: dict | None = None, extra_env: di
     def _worker():
         try:
             try:
-                code, out = container_manager.execute_command(cmd, str(uuid.uuid4()), extra_env=extra_env)
+                code, out = container_manager.execute_command(cmd, uuid.uuid4().hex, extra_env=extra_env)
             except TypeError:
                 # Some test fakes do not accept extra_env
-                code, out = container_manager.execute_command(cmd, str(uuid.uuid4()))
+                code, out = container_manager.execute_command(cmd, uuid.uuid4().hex)
             result["exit_code"] = code
             result["output"] = out
         except Exception as e:
             result["error"] = str(e)
 
-    import threading as _th
-    t = _th.Thread(target=_worker, daemon=True)
+    t = threading.Thread(target=_worker, daemon=True)
     t.start()
     t.join(timeout=timeout_s)
     if t.is_alive():
@@ -280,6 +345,183 @@ def _exec_with_timeout(cmd: str, *, arguments: dict | None = None, extra_env: di
     return False, result.get("exit_code"), result.get("output", "")
 
 
+_WS_RE = re.compile(r"^/workspace(?:/(.*))?\Z", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=4096)
+def _to_rel(raw: str) -> str:
+    """Map '/workspace', '/workspace/<p>' or a relative path to a workspace-relative path.
+
+    Raises ValueError for absolute paths outside /workspace.
+    """
+    m = _WS_RE.match(raw)
+    if m:
+        return m.group(1) or "."
+    if raw.startswith("/"):
+        raise ValueError(
+            "Absolute paths outside /workspace are not allowed; provide a workspace-relative path or one under /workspace"
+        )
+    return raw
+
+
+def _to_ws_abs(raw: str) -> str:
+    """Map a workspace path (relative or under /workspace) to its absolute container path."""
+    rel = _to_rel(str(raw).strip())
+    return "/workspace" if rel == "." else f"/workspace/{rel}"
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_globs(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    """Compile shell globs into one alternation regex (None when there are no patterns)."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+def _repo_cd_prefix(repo_path: Any) -> str:
+    """Shell prefix that enters a workspace repo: cd /workspace && cd -- <repo_path> && ."""
+    return f"cd /workspace && cd -- {shlex.quote(str(repo_path))} && "
+
+
+def _repo_abs(repo_path: Any) -> str:
+    """Container path of a workspace repo given relative to /workspace (or absolute)."""
+    return posixpath.join("/workspace", str(repo_path))
+
+
+def _exec_argv_with_timeout(
+    argv: list[str], *, cwd: str | None = None, arguments: dict | None = None, extra_env: dict | None = None
+) -> tuple[bool, int | None, str]:
+    """Run an argv list in the container without a shell; same contract as _exec_with_timeout.
+
+    Managers without execute_argv (e.g. test fakes) get the equivalent shlex-joined
+    command through _exec_with_timeout instead.
+    """
+    exec_argv = getattr(container_manager, "execute_argv", None)
+    if exec_argv is None:
+        cmd = shlex.join(argv)
+        if cwd:
+            cmd = f"cd -- {shlex.quote(cwd)} && {cmd}"
+        return _exec_with_timeout(cmd, arguments=arguments, extra_env=extra_env)
+
+    timeout_s = _timeout_seconds(arguments)
+
+    result: dict[str, Any] = {}
+
+    def _worker():
+        try:
+            code, out = exec_argv(argv, uuid.uuid4().hex, workdir=cwd, extra_env=extra_env)
+            result["exit_code"] = code
+            result["output"] = out
+        except Exception as e:
+            result["error"] = str(e)
+
+    t = threading.Thread(target=_worker, daemon=True)
+    t.start()
+    t.join(timeout=timeout_s)
+    if t.is_alive():
+        return True, None, ""
+    if "error" in result:
+        return False, 1, result.get("error", "error")
+    return False, result.get("exit_code"), result.get("output", "")
+
+
+def _scandir_find(
+    base_host: str,
+    dir_patterns: tuple[str, ...],
+    path_patterns: tuple[str, ...] = (),
+    prune_names: frozenset[str] = frozenset({".git", ".agent"}),
+    max_depth: int | None = None,
+    max_workers: int = 8,
+) -> list[str]:
+    """In-process equivalent of a pruned `find . ... -print` rooted at base_host.
+
+    Emits './'-prefixed paths in find's depth-first order for directories whose
+    name matches one of dir_patterns, and for any entry whose './'-relative path
+    matches one of path_patterns. Entries named in prune_names are skipped
+    without descending, and directories deeper than max_depth (entries of base_host
+    are depth 1) are reported but not descended into. Uses DirEntry type info only
+    (no per-entry stat), and each pattern set is compiled once into a single regex.
+
+    When base_host has more than four subdirectories, their subtrees are walked on a
+    thread pool (up to max_workers) so several getdents calls are in flight at once;
+    results are merged back in traversal order.
+    """
+    dir_re = _compile_globs(tuple(dir_patterns))
+    path_re = _compile_globs(tuple(path_patterns))
+
+    def _scan(root: str, prefix: str, depth: int) -> list[tuple[str, bool, str | None]]:
+        """List root once: (rel, matched, path-to-descend-or-None) per non-pruned entry."""
+        rows: list[tuple[str, bool, str | None]] = []
+        try:
+            it = os.scandir(root)
+        except OSError:
+            return rows
+        with it:
+            for entry in it:
+                name = entry.name
+                if name in prune_names:
+                    continue
+                rel = f"{prefix}/{name}"
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                if is_dir and dir_re is not None and dir_re.match(name):
+                    matched = True
+                else:
+                    matched = path_re is not None and path_re.match(rel) is not None
+                descend = is_dir and (max_depth is None or depth < max_depth)
+                rows.append((rel, matched, entry.path if descend else None))
+        return rows
+
+    def _walk(root: str, prefix: str, depth: int, out: list[str]) -> list[str]:
+        for rel, matched, sub in _scan(root, prefix, depth):
+            if matched:
+                out.append(rel)
+            if sub is not None:
+                _walk(sub, rel, depth + 1, out)
+        return out
+
+    top = _scan(base_host, ".", 1)
+    descents = [(sub, rel) for rel, _matched, sub in top if sub is not None]
+    subtrees: dict[str, list[str]]
+    if len(descents) > 4 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(descents))) as pool:
+            walked = pool.map(lambda d: _walk(d[0], d[1], 2, []), descents)
+            subtrees = {rel: found for (_sub, rel), found in zip(descents, walked)}
+    else:
+        subtrees = {rel: _walk(sub, rel, 2, []) for sub, rel in descents}
+
+    items: list[str] = []
+    for rel, matched, sub in top:
+        if matched:
+            items.append(rel)
+        if sub is not None:
+            items.extend(subtrees[rel])
+    return items
+
+
+# Venv discovery (host scan and container find): subtrees that never hold a project venv,
+# and how deep to look. A venv at <repo>/<sub>/.venv is at depth 3 below the workspace root.
+_VENV_SCAN_SKIP_DIRS = frozenset({
+    ".git", ".agent", "node_modules", "__pycache__", "target", "build", "dist", ".tox", ".mypy_cache",
+})
+_VENV_SCAN_MAX_DEPTH = 5
+# The container-side equivalent of the host scan, with the same prune set and depth cap
+_VENV_FIND_CMD = (
+    f"find . -maxdepth {_VENV_SCAN_MAX_DEPTH} "
+    f"\\( {' -o '.join(f'-name {n}' for n in sorted(_VENV_SCAN_SKIP_DIRS))} \\) -prune -o "
+    "\\( -type d \\( -name '*venv*' -o -name '*_env*' \\) -o -path '*/bin/activate' \\) -print"
+)
+
+
+def _venv_root(path: str) -> str:
+    """Map a find/scan hit to its venv root: strip a trailing /bin/activate, else trailing slashes."""
+    if path.endswith("/bin/activate"):
+        return path[: -len("/bin/activate")]
+    return path.rstrip("/")
+
+
 # Initialize the MCP server
 app = Server("effective-potato")
 
@@ -292,6 +534,17 @@ This server now exposes a single toolkit intended for coding agents.
 """
 
 
+# Tools published only while the gh CLI is usable in the container
+_GITHUB_TOOL_NAMES = frozenset({"github_get_repository", "github_clone_repository"})
+
+
+def _github_tools_available() -> bool:
+    try:
+        return bool(container_manager and getattr(container_manager, "is_github_available") and container_manager.is_github_available())
+    except Exception:
+        return False
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools (slim set)."""
@@ -499,7 +752,7 @@ async def list_tools() -> list[Tool]:
     tools.append(
         Tool(
             name="potato_find_venvs",
-            description="Find virtualenv roots by matching *venv*/*_env* folders or bin/activate paths (prunes .git and .agent). Also returns 'venv_roots' and 'activations' with 'source <venv_root>/bin/activate' commands.",
+            description="Find virtualenv roots by matching *venv*/*_env* folders or bin/activate paths (prunes .git, .agent, node_modules, build output and caches; at most 5 levels deep). Also returns 'venv_roots' and 'activations' with 'source <venv_root>/bin/activate' commands.",
             inputSchema={"type": "object", "properties": {"path": {"type": "string"}}},
         )
     )
@@ -666,12 +919,7 @@ async def list_tools() -> list[Tool]:
     )
 
     # GitHub tools (only if gh available)
-    has_gh = False
-    try:
-        has_gh = bool(container_manager and getattr(container_manager, "is_github_available") and container_manager.is_github_available())
-    except Exception:
-        has_gh = False
-    if has_gh:
+    if _github_tools_available():
         tools.extend([
             Tool(
                 name="github_get_repository",
@@ -699,1136 +947,1211 @@ async def list_tools() -> list[Tool]:
     return tools
 
 
-@app.call_tool()
-@no_type_check
-async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls."""
-    # If a tool is not published, fail fast as "Unknown tool".
-    # This also avoids returning container initialization errors for callers probing tool availability.
-    published_names = {t.name for t in (await list_tools())}
-    if name not in published_names:
-        raise ValueError(f"Unknown tool: {name}")
+# ---------------------------
+# Tool handlers
+# ---------------------------
+def _elapsed_ms(start_ns: int) -> int:
+    """Milliseconds since a time.monotonic_ns() reading (immune to wall-clock jumps)."""
+    return (time.monotonic_ns() - start_ns) // 1_000_000
 
-    # Only require container_manager for tools that interact with the container
-    container_required = name not in {"potato_select_venv"}
-    if container_required and not container_manager:
-        raise RuntimeError("Container manager not initialized")
-    # Local non-None alias for type checking
-    cm: ContainerManager | None = container_manager
-    
 
-    # Add a per-call request ID for structured logging
-    req_id = str(uuid.uuid4())
-    logger.info(f"[req={req_id}] call_tool name={name}")
+def _with_progress_reminder(h: str) -> str:
+    """Append the progress-update reminder to a hint (idempotent)."""
+    suffix = " Always include a brief status update on the overall task progress (what's done, what's next, blockers)."
+    try:
+        h = (h or "").rstrip()
+    except Exception:
+        h = ""
+    # Avoid duplicating the suffix if already present
+    if suffix.strip() in h:
+        return h
+    if h:
+        return f"{h} {suffix}"
+    return suffix.strip()
 
-    import time as __t
-    __start_ms = int(__t.time() * 1000)
 
-    # Helper to enforce progress update reminder in hints
-    def _with_progress_reminder(h: str) -> str:
-        suffix = " Always include a brief status update on the overall task progress (what's done, what's next, blockers)."
-        try:
-            h = (h or "").rstrip()
-        except Exception:
-            h = ""
-        # Avoid duplicating the suffix if already present
-        if suffix.strip() in h:
-            return h
-        if h:
-            return f"{h} {suffix}"
-        return suffix.strip()
-
-    if name == "potato_execute_command":
-        import threading
-        command = arguments.get("command")
-        if not command:
-            raise ValueError("Command is required")
-
-        # Guard: prevent accidental repository initialization at workspace root
-        if _would_git_init_workspace_root(str(command)):
-            import json as _json
-            payload = {
-                "exit_code": 3,
-                "message": "Blocked: git init at workspace root is not allowed.",
-                "hint": _with_progress_reminder("Initialize repositories inside a project subdirectory (e.g., /workspace/myproj). Use 'cd myproj && git init'."),
-                "blocked": True,
-            }
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps(payload))]
+# Constant responses, serialized once at import
+_PUSH_CONFIRM_JSON = _dumps({
+    "exit_code": 2,
+    "message": "Push requires explicit approval.",
+    "hint": _with_progress_reminder("Do not run this tool unless the user clearly asked to push. Ask the user to confirm and set confirm=true when calling this tool."),
+    "required_action": "Ask for user confirmation to proceed with git push.",
+})
 
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())
+@functools.lru_cache(maxsize=64)
+def _timeout_members(message: str, hint: str) -> str:
+    """Serialized message and hint members of a timeout response, up to the closing brace."""
+    return _dumps({"message": message, "hint": _with_progress_reminder(hint)})[1:]
 
-        # Optional timeout for waiting on the command (defaults to 120s)
-        try:
-            timeout_s = int(arguments.get("timeout_seconds", 120))
-        except Exception:
-            timeout_s = 120
 
-        # Background mode support
-        run_bg = bool(arguments.get("background", False))
+def _timeout_text(arguments: Any, message: str, hint: str) -> str:
+    """JSON text for a timed-out tool call; only timeout_seconds is formatted per call."""
+    return f'{{"exit_code": null, "timeout_seconds": {_timeout_seconds(arguments)}, {_timeout_members(message, hint)}'
+
 
-        result_holder: dict[str, Any] = {}
+@no_type_check
+def _tool_potato_execute_command(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    command = arguments.get("command")
+    if not command:
+        raise ValueError("Command is required")
+
+    # Guard: prevent accidental repository initialization at workspace root
+    if _would_git_init_workspace_root(str(command)):
+        payload = {
+            "exit_code": 3,
+            "message": "Blocked: git init at workspace root is not allowed.",
+            "hint": _with_progress_reminder("Initialize repositories inside a project subdirectory (e.g., /workspace/myproj). Use 'cd myproj && git init'."),
+            "blocked": True,
+        }
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_dumps(payload))]
 
-        env_map = arguments.get("env") or {}
+    # Generate unique task ID
+    task_id = uuid.uuid4().hex
+
+    # Optional timeout for waiting on the command (defaults to 120s)
+    timeout_s = _timeout_seconds(arguments)
+
+    # Background mode support
+    run_bg = bool(arguments.get("background", False))
+
+    result_holder: dict[str, Any] = {}
+
+    env_map = arguments.get("env") or {}
+
+    if run_bg:
+        if not cm:
+            raise RuntimeError("Container manager not initialized")
+        info = cm.start_background_task(command, task_id, extra_env=env_map)
+        payload = {"task_id": info.get("task_id", task_id), "exit_code": info.get("exit_code"), "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to read logs, and potato_task_kill to stop the process.")}
+        logger.info(f"[req={req_id}] tool={name} started background task_id={task_id}")
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_dumps(payload))]
 
-        if run_bg:
+    def _worker():
+        try:
             if not cm:
                 raise RuntimeError("Container manager not initialized")
-            info = cm.start_background_task(command, task_id, extra_env=env_map)
-            import json as _json
-            payload = {"task_id": info.get("task_id", task_id), "exit_code": info.get("exit_code"), "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to read logs, and potato_task_kill to stop the process.")}
-            logger.info(f"[req={req_id}] tool={name} started background task_id={task_id}")
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps(payload))]
+            code, out = cm.execute_command(command, task_id, extra_env=env_map)
+            result_holder["exit_code"] = code
+            result_holder["output"] = out
+        except Exception as e:
+            result_holder["error"] = str(e)
 
-        def _worker():
-            try:
-                if not cm:
-                    raise RuntimeError("Container manager not initialized")
-                code, out = cm.execute_command(command, task_id, extra_env=env_map)
-                result_holder["exit_code"] = code
-                result_holder["output"] = out
-            except Exception as e:
-                result_holder["error"] = str(e)
+    t = threading.Thread(target=_worker, daemon=True)
+    t.start()
+    t.join(timeout=timeout_s)
 
-        t = threading.Thread(target=_worker, daemon=True)
-        t.start()
-        t.join(timeout=timeout_s)
+    if t.is_alive():
+        payload = {
+            "exit_code": None,
+            "running": True,
+            "task_id": task_id,
+            "timeout_seconds": timeout_s,
+            "message": "Command still running; call again with a larger timeout to wait longer.",
+            "hint": _with_progress_reminder("If you need the final output, call again with a larger timeout or poll until running=false. Alternatively, rerun with background=true and use potato_task_output to tail logs and potato_task_kill to stop when done."),
+        }
+        logger.info(f"[req={req_id}] tool={name} still running task_id={task_id} timeout={timeout_s}s")
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_dumps(payload))]
+    else:
+        if "error" in result_holder:
+            logger.error(f"[req={req_id}] tool={name} error={result_holder['error']}")
+            record_tool_metric(name, _elapsed_ms(start_ns))
+            return [TextContent(type="text", text=_dumps({"exit_code": 1, "error": result_holder["error"], "hint": _with_progress_reminder("Check the error field and adjust the command or environment; re-run if needed.")}))]
+        exit_code = result_holder.get("exit_code")
+        output = result_holder.get("output", "")
+        logger.info(f"[req={req_id}] tool={name} completed exit_code={exit_code}")
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_dumps({"exit_code": exit_code, "output": output, "hint": _with_progress_reminder("Parse and surface the command output to the user only if relevant; otherwise keep it in the tool trace.")}))]
+
+
+@no_type_check
+def _tool_potato_screenshot(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    # Validate and coerce via Pydantic
+    parsed = ScreenshotInput(**(arguments or {}))
+    import datetime as dt
+    import os
+    delay = int(parsed.delay_seconds)
+    filename = parsed.filename
+    ts = dt.datetime.now(dt.UTC).strftime("%Y%m%dT%H%M%S")
+    # Always suffix filenames with a UUID to avoid overwrites
+    _uid = uuid.uuid4().hex
+    if filename:
+        root, ext = os.path.splitext(str(filename))
+        ext = ext or ".png"
+        out_name = f"{root}_{_uid}{ext}"
+    else:
+        out_name = f"screenshot_{ts}_{_uid}.png"
+    out_path = f"/workspace/.agent/screenshots/{out_name}"
+    # GUI readiness: ensure DISPLAY responds; try small retry loop before capture
+    cmd = (
+        "mkdir -p /workspace/.agent/screenshots && "
+        f"sleep {max(0, delay)}; "
+        "export DISPLAY=:0; "
+        "for i in 1 2 3; do xset q >/dev/null 2>&1 && break; sleep 1; done; "
+        "xdotool key XF86Refresh >/dev/null 2>&1 || true; "
+        f"xfce4-screenshooter -f -s {shlex.quote(out_path)}"
+    )
+    # Execute with default timeout behavior (120s unless overridden)
+    timed_out, exit_code, output = _exec_with_timeout(cmd, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "Screenshot still running; try again with a larger timeout.", "Increase timeout_seconds if you need to wait longer for the desktop to settle before capture."))]
+    resp = {"exit_code": exit_code, "screenshot_path": out_path, "output": output,
+            "hint": _with_progress_reminder("Display the screenshot to the user; use the provided 'screenshot_path'.")}
+    logger.info(f"[req={req_id}] tool={name} completed exit_code={exit_code} path={out_path}")
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(resp))]
 
-        if t.is_alive():
-            import json as _json
-            payload = {
-                "exit_code": None,
-                "running": True,
-                "task_id": task_id,
-                "timeout_seconds": timeout_s,
-                "message": "Command still running; call again with a larger timeout to wait longer.",
-                "hint": _with_progress_reminder("If you need the final output, call again with a larger timeout or poll until running=false. Alternatively, rerun with background=true and use potato_task_output to tail logs and potato_task_kill to stop when done."),
-            }
-            logger.info(f"[req={req_id}] tool={name} still running task_id={task_id} timeout={timeout_s}s")
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps(payload))]
-        else:
-            import json as _json
-            if "error" in result_holder:
-                logger.error(f"[req={req_id}] tool={name} error={result_holder['error']}")
-                record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-                return [TextContent(type="text", text=_json.dumps({"exit_code": 1, "error": result_holder["error"], "hint": _with_progress_reminder("Check the error field and adjust the command or environment; re-run if needed.")}))]
-            exit_code = result_holder.get("exit_code")
-            output = result_holder.get("output", "")
-            logger.info(f"[req={req_id}] tool={name} completed exit_code={exit_code}")
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": exit_code, "output": output, "hint": _with_progress_reminder("Parse and surface the command output to the user only if relevant; otherwise keep it in the tool trace.")}))]
-    # 'potato_recommended_flow' intentionally disabled
-    elif name == "potato_screenshot":
-        # Validate and coerce via Pydantic
-        parsed = ScreenshotInput(**(arguments or {}))
-        import datetime as dt
-        import os
-        delay = int(parsed.delay_seconds)
-        filename = parsed.filename
-        ts = dt.datetime.now(dt.UTC).strftime("%Y%m%dT%H%M%S")
-        # Always suffix filenames with a UUID to avoid overwrites
-        _uid = uuid.uuid4().hex
-        if filename:
-            root, ext = os.path.splitext(str(filename))
-            ext = ext or ".png"
-            out_name = f"{root}_{_uid}{ext}"
-        else:
-            out_name = f"screenshot_{ts}_{_uid}.png"
-        out_path = f"/workspace/.agent/screenshots/{out_name}"
-        # GUI readiness: ensure DISPLAY responds; try small retry loop before capture
-        cmd = (
-            "mkdir -p /workspace/.agent/screenshots && "
-            f"sleep {max(0, delay)}; "
-            "export DISPLAY=:0; "
-            "for i in 1 2 3; do xset q >/dev/null 2>&1 && break; sleep 1; done; "
-            "xdotool key XF86Refresh >/dev/null 2>&1 || true; "
-            f"xfce4-screenshooter -f -s '{out_path}'"
-        )
-        task_id = str(uuid.uuid4())
-        # Execute with default timeout behavior (120s unless overridden)
-        timed_out, exit_code, output = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "Screenshot still running; try again with a larger timeout.", "hint": _with_progress_reminder("Increase timeout_seconds if you need to wait longer for the desktop to settle before capture.")}))]
-        import json as _json
-        resp = {"exit_code": exit_code, "screenshot_path": out_path, "output": output,
-                "hint": _with_progress_reminder("Display the screenshot to the user; use the provided 'screenshot_path'.")}
-        logger.info(f"[req={req_id}] tool={name} completed exit_code={exit_code} path={out_path}")
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(resp))]
-    elif name == "potato_select_venv":
-        import json as _json
-        paths = arguments.get("paths") or []
-        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
-            raise ValueError("'paths' must be a list of strings")
-
-        def _category(p: str) -> int:
-            base = (p.rstrip("/").split("/") or [""])[-1]
-            if base == ".venv":
-                return 0
-            if base == "venv":
-                return 1
-            if "_env" in base or base.endswith("env") or base.endswith("_env"):
-                return 2
-            if base == "env":
-                return 3
-            return 9
-
-        def _depth(p: str) -> int:
-            return len([s for s in p.split("/") if s])
-
-        def _parent_len(p: str) -> int:
-            parts = [s for s in p.rstrip("/").split("/") if s]
-            return len(parts[-2]) if len(parts) >= 2 else 0
-
-        best = None
-        if paths:
-            best = sorted(paths, key=lambda p: (_category(p), _depth(p), -_parent_len(p), p))[0]
-
-        activate = f"source {best}/bin/activate" if best else None
-        payload = {"best": best, "candidates": list(paths), "activate": activate}
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(payload))]
-    elif name == "potato_find_venvs":
-        subpath = arguments.get("path") or "."
-        if not isinstance(subpath, str):
-            raise ValueError("'path' must be a string if provided")
-        raw = str(subpath).strip()
-        if raw == "/workspace":
-            rel = "."
-        elif raw.startswith("/workspace/"):
-            rel = raw[len("/workspace/"):]
-            if not rel:
-                rel = "."
-        elif raw.startswith("/"):
-            raise ValueError("Absolute paths outside /workspace are not allowed; provide a workspace-relative path or one under /workspace")
-        else:
-            rel = raw
 
-            # Search for venv roots: directories named like *venv* or *_env*, or subfolders containing bin/activate.
-            # Exclude .git but do NOT exclude venv-like directories.
-        # Build the container-side find command expected by unit tests
-        rel_esc = rel.replace("'", "'\\''")
+@no_type_check
+def _tool_potato_select_venv(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    paths = arguments.get("paths") or []
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        raise ValueError("'paths' must be a list of strings")
+
+    def _category(p: str) -> int:
+        base = (p.rstrip("/").split("/") or [""])[-1]
+        if base == ".venv":
+            return 0
+        if base == "venv":
+            return 1
+        if "_env" in base or base.endswith("env") or base.endswith("_env"):
+            return 2
+        if base == "env":
+            return 3
+        return 9
+
+    def _depth(p: str) -> int:
+        return len([s for s in p.split("/") if s])
+
+    def _parent_len(p: str) -> int:
+        parts = [s for s in p.rstrip("/").split("/") if s]
+        return len(parts[-2]) if len(parts) >= 2 else 0
+
+    best = None
+    if paths:
+        best = sorted(paths, key=lambda p: (_category(p), _depth(p), -_parent_len(p), p))[0]
+
+    activate = f"source {best}/bin/activate" if best else None
+    payload = {"best": best, "candidates": list(paths), "activate": activate}
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(payload))]
+
+
+@no_type_check
+def _tool_potato_find_venvs(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    subpath = arguments.get("path") or "."
+    if not isinstance(subpath, str):
+        raise ValueError("'path' must be a string if provided")
+    rel = _to_rel(str(subpath).strip())
+
+    # Search for venv roots: directories named like *venv* or *_env*, or subfolders containing bin/activate.
+    # Prune _VENV_SCAN_SKIP_DIRS (both paths) but do NOT exclude venv-like directories.
+    items: list[str]
+    # When the workspace is bind-mounted on this host, walk it in-process instead of
+    # paying for a container exec + find; otherwise run find inside the container.
+    host_ws = getattr(cm, "workspace_dir", None)
+    host_ws = str(host_ws) if host_ws is not None and os.path.isdir(host_ws) else None
+    base_host = None
+    if host_ws:
+        # Resolve '..' and symlinks before walking so the scan cannot leave the workspace
+        ws_real = os.path.realpath(host_ws)
+        base_host = os.path.realpath(os.path.join(ws_real, rel))
+        if os.path.commonpath([base_host, ws_real]) != ws_real:
+            raise ValueError("'path' must stay inside /workspace")
+    if base_host and os.path.isdir(base_host):
+        items = _scandir_find(
+            base_host,
+            ("*venv*", "*_env*"),
+            ("*/bin/activate",),
+            prune_names=_VENV_SCAN_SKIP_DIRS,
+            max_depth=_VENV_SCAN_MAX_DEPTH,
+        )
+        exit_code = 0
+    elif host_ws:
+        # Workspace is visible but the subpath is not a directory: nothing to find, skip the exec
+        items = []
+        exit_code = 0
+    else:
         find_cmd = (
             "cd /workspace && "
-            f"cd -- '{rel_esc}' && "
-            "find . \\(-name .git -o -name .agent\\) -prune -o "
-            "\\( -type d \\( -name '*venv*' -o -name '*_env*' \\) -o -path '*/bin/activate' \\) -print"
+            f"cd -- {shlex.quote(rel)} && "
+            f"{_VENV_FIND_CMD}"
         )
-        task_id = str(uuid.uuid4())
         timed_out, exit_code, output = _exec_with_timeout(find_cmd, arguments=arguments)
-        items: list[str]
-        # If the container-side find worked, use it; otherwise fallback to a host-side scan for robustness
         if (not timed_out) and (exit_code == 0) and output and not output.strip().startswith("find:"):
-            items = [line for line in (output or "").splitlines() if line.strip()]
+            # find emits one path per line; split("\n") avoids splitlines' extra line-break scanning
+            items = [line for line in output.split("\n") if line]
         else:
-            import os as _os
-            from pathlib import Path as _Path
             if not cm:
                 raise RuntimeError("Container manager not initialized")
-            base_host = (_Path(cm.workspace_dir) / rel).resolve()
             items = []
-            for root, dirs, files in _os.walk(base_host):
-                # prune
-                dirs[:] = [d for d in dirs if d not in {".git", ".agent"}]
-                # rel path from base_host
-                rel_root = "." if _Path(root) == base_host else "./" + str(_Path(root).relative_to(base_host)).replace("\\", "/")
-                # venv-like directories
-                for d in dirs:
-                    if ("venv" in d) or ("_env" in d):
-                        items.append(f"{rel_root}/{d}")
-                # bin/activate file
-                act = _Path(root)/"bin"/"activate"
-                if act.exists():
-                    items.append(f"{rel_root}/bin/activate")
-            exit_code = 0
-        # Derive potential venv roots (if a bin/activate path was returned, strip the /bin/activate)
-        def _venv_root(p: str) -> str:
-            if p.endswith("/bin/activate"):
-                return p[: -len("/bin/activate")]
-            return p.rstrip("/")
-        venv_roots = sorted(set(_venv_root(it) for it in items))
-        activations = [f"source {root}/bin/activate" for root in venv_roots]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        import json as _json
-        return [TextContent(type="text", text=_json.dumps({
-            "exit_code": exit_code,
-            "items": items,
-            "venv_roots": venv_roots,
-            "activations": activations,
-            "hint": _with_progress_reminder("Chain these: (1) pass venv_roots (or items) to potato_select_venv to get 'activate'; (2) provide that string as 'venv' to potato_launch_and_screenshot or potato_interact_and_record (optionally set 'launch_command'); those tools will run '<venv> && <launch_command>' for you.")
-        }))]
-    elif name == "potato_task_start":
-        command = arguments.get("command")
-        if not command:
-            raise ValueError("'command' is required")
-        env_map = arguments.get("env") or {}
-        task_id = str(uuid.uuid4())
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        info = cm.start_background_task(command, task_id, extra_env=env_map)
-        import json as _json
-        payload = {"task_id": task_id, **info, "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to terminate if needed.")}
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(payload))]
-    elif name == "potato_task_status":
-        task_id = arguments.get("task_id")
-        if not task_id:
-            raise ValueError("'task_id' is required")
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        status = cm.get_task_status(task_id)
-        import json as _json
-        status["hint"] = _with_progress_reminder("If running=true, continue polling or use potato_task_output to tail logs. When exit_code is not None, summarize results and surface artifacts.")
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(status))]
-    elif name == "potato_task_kill":
-        task_id = arguments.get("task_id")
-        sig = arguments.get("signal", "TERM")
-        if not task_id:
-            raise ValueError("'task_id' is required")
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        result = cm.kill_task(task_id, signal=sig)
-        import json as _json
-        result["hint"] = _with_progress_reminder("If the task doesn't stop, try signal=KILL. Then poll status again.")
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(result))]
-    elif name == "potato_task_output":
-        task_id = arguments.get("task_id")
-        tail = arguments.get("tail", 0)
-        if not task_id:
-            raise ValueError("'task_id' is required")
+    # Sorted for a stable response: scandir/find discovery order depends on the filesystem
+    venv_roots = sorted({_venv_root(p) for p in items})
+    activations = [f"source {root}/bin/activate" for root in venv_roots]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({
+        "exit_code": exit_code,
+        "items": items,
+        "venv_roots": venv_roots,
+        "activations": activations,
+        "hint": _with_progress_reminder("Chain these: (1) pass venv_roots (or items) to potato_select_venv to get 'activate'; (2) provide that string as 'venv' to potato_launch_and_screenshot or potato_interact_and_record (optionally set 'launch_command'); those tools will run '<venv> && <launch_command>' for you.")
+    }))]
+
+
+@no_type_check
+def _tool_potato_task_start(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    command = arguments.get("command")
+    if not command:
+        raise ValueError("'command' is required")
+    env_map = arguments.get("env") or {}
+    task_id = uuid.uuid4().hex
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    info = cm.start_background_task(command, task_id, extra_env=env_map)
+    payload = {"task_id": task_id, **info, "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to terminate if needed.")}
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(payload))]
+
+
+@no_type_check
+def _tool_potato_task_status(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    task_id = _task_id_arg(arguments)
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    status = cm.get_task_status(task_id)
+    status["hint"] = _with_progress_reminder("If running=true, continue polling or use potato_task_output to tail logs. When exit_code is not None, summarize results and surface artifacts.")
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(status))]
+
+
+@no_type_check
+def _tool_potato_task_kill(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    task_id = _task_id_arg(arguments)
+    sig = arguments.get("signal", "TERM")
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    result = cm.kill_task(task_id, signal=sig)
+    result["hint"] = _with_progress_reminder("If the task doesn't stop, try signal=KILL. Then poll status again.")
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(result))]
+
+
+@no_type_check
+def _tool_potato_task_output(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    task_id = _task_id_arg(arguments)
+    n = _count_arg(arguments, "tail", 0)
+    # Read the out file; apply tail if requested
+    out_path = f"/workspace/.agent/tmp_scripts/task_{task_id}.out"
+    q_out = shlex.quote(out_path)
+    if n > 0:
+        cmd = f"test -f {q_out} && tail -n {n} {q_out} || true"
+    else:
+        cmd = f"test -f {q_out} && cat {q_out} || true"
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    code, out = cm.execute_command(cmd, uuid.uuid4().hex)
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "content": out or "", "path": out_path, "hint": _with_progress_reminder("Show a concise excerpt (use tail for long logs) and offer to open or download if needed.")}))]
+
+
+@no_type_check
+def _tool_potato_task_list(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    include_status = bool(arguments.get("include_status", False)) if isinstance(arguments, dict) else False
+    # List files matching task_*.pid under tmp_scripts; derive task IDs
+    probe = (
+        "cd /workspace/.agent/tmp_scripts 2>/dev/null || exit 0; "
+        "ls -1 task_*.pid 2>/dev/null | sed -e 's/^task_//' -e 's/\\.pid$//'"
+    )
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    code, out = cm.execute_command(probe, uuid.uuid4().hex)
+    # sed has already stripped the task_ prefix and .pid suffix, so each line is a task id
+    task_ids = [line for line in (ln.strip() for ln in (out or "").splitlines()) if line]
+    payload = {"exit_code": code, "tasks": task_ids}
+    if include_status and task_ids:
+        statuses: dict[str, Any] = {}
+        for tid in task_ids:
+            try:
+                statuses[tid] = cm.get_task_status(tid)
+            except Exception as e:
+                statuses[tid] = {"error": str(e)}
+        payload["statuses"] = statuses
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(payload))]
+
+
+@no_type_check
+def _tool_github_clone_repository(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    if not cm or not cm.is_github_available():
+        raise RuntimeError("GitHub CLI is not available. Set GITHUB_PERSONAL_ACCESS_TOKEN in local/.env")
+
+    owner = arguments.get("owner")
+    repo = arguments.get("repo")
+
+    if not owner or not repo:
+        raise ValueError("Both 'owner' and 'repo' are required")
+
+    # Execute the clone repository command
+    exit_code, output = cm.clone_repository(owner=owner, repo=repo)
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": exit_code, "output": output, "hint": _with_progress_reminder("If cloning succeeded, add the repo to your workspace context and consider listing files or opening README next.")}))]
+
+
+@no_type_check
+def _tool_potato_launch_and_screenshot(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    data = LaunchAndScreenshotInput(**(arguments or {}))
+    launch_command = data.launch_command
+    delay = int(data.delay_seconds)
+    filename = data.filename
+    working_dir = data.working_dir
+    env_map = data.env or {}
+    venv_cmd = (data.venv or "").strip() or None
+    if not launch_command:
+        raise ValueError("'launch_command' is required")
+
+    # Build the script to launch the app and screenshot
+    import datetime as dt
+    import os
+    shot_dir = "/workspace/.agent/screenshots"
+    # Create directory and run command
+    ts = dt.datetime.now(dt.UTC).strftime("%Y%m%dT%H%M%S")
+    # Always suffix filenames with a UUID to avoid overwrites
+    _uid = uuid.uuid4().hex
+    if filename:
+        root, ext = os.path.splitext(str(filename))
+        ext = ext or ".png"
+        out_name = f"{root}_{_uid}{ext}"
+    else:
+        out_name = f"screenshot_{ts}_{_uid}.png"
+    out_path = f"{shot_dir}/{out_name}"
+
+    # Prepare optional env exports and working directory change
+    export_snippets = []
+    if isinstance(env_map, dict):
+        for k, v in env_map.items():
+            try:
+                ks = str(k)
+                export_snippets.append(f"export {ks}={shlex.quote(str(v))}")
+            except Exception:
+                continue
+    exports = ("; ".join(export_snippets) + "; ") if export_snippets else ""
+
+    cd_snippet = ""
+    if working_dir:
+        cd_snippet = f"cd /workspace && cd -- {shlex.quote(str(working_dir))} && "
+
+    # Prepend optional venv activation if provided
+    launch_with_venv = f"({venv_cmd} && {launch_command})" if venv_cmd else f"({launch_command})"
+
+    cmd = (
+        "mkdir -p /workspace/.agent/screenshots && "
+        f"{cd_snippet}{exports}"
+        f"{launch_with_venv} >/tmp/launch.log 2>&1 & "
+        f"sleep {delay}; "
+        "export DISPLAY=:0; "
+        "for i in 1 2 3; do xset q >/dev/null 2>&1 && break; sleep 1; done; "
+        "xdotool key XF86Refresh >/dev/null 2>&1 || true; "
+        f"xfce4-screenshooter -f -s {shlex.quote(out_path)}"
+    )
+    timed_out, exit_code, output = _exec_with_timeout(cmd, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "Launch and capture still running; try again with a larger timeout.", "Increase timeout_seconds if the app needs longer to render before capture."))]
+    resp = {"exit_code": exit_code, "screenshot_path": out_path, "output": output,
+            "hint": _with_progress_reminder("Display the screenshot to the user; use the provided 'screenshot_path'.")}
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps(resp))]
+
+
+@no_type_check
+def _tool_potato_workspace_multi_tool_pipeline(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    # Deprecated: no longer exposed. Provide a clear deprecation message.
+    msg = (
+        "The multi-tool pipeline (potato_workspace_multi_tool_pipeline) is deprecated and no longer exposed. "
+        "Invoke individual tools directly in sequence instead."
+    )
+    return [TextContent(type="text", text=msg)]
+
+
+@no_type_check
+def _tool_potato_interact_and_record(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    # Parse and validate inputs using Pydantic schema
+    parsed = InteractAndRecordInput(**(arguments or {}))
+    launch_command = (parsed.launch_command or "").strip()
+    venv_cmd = (parsed.venv or "").strip()
+    inputs = parsed.inputs
+    duration = int(parsed.duration_seconds)
+    interval = int(parsed.frame_interval_ms)
+    base = parsed.output_basename
+    working_dir = (parsed.working_dir or "").strip()
+    env_map = parsed.env or {}
+    # Small grace period after launch so windows can appear
+    post_launch_delay = int(parsed.post_launch_delay_seconds)
+
+    # If launch_command starts with a leading 'cd <dir> && ...', extract it as working_dir
+    # so that venv activation occurs in the intended directory and the remaining command runs there.
+    if launch_command:
+        m = _LEADING_CD_RE.match(launch_command)
+        if m:
+            wd_raw = m.group(1).strip()
+            rest = (m.group(2) or "").strip() or "true"
+            # Strip quotes around the directory if provided
+            if (wd_raw.startswith("'") and wd_raw.endswith("'")) or (wd_raw.startswith('"') and wd_raw.endswith('"')):
+                wd_raw = wd_raw[1:-1]
+            # Only adopt if caller didn't explicitly provide working_dir
+            if not working_dir:
+                working_dir = wd_raw
+            # Remove the leading cd from the launch command to avoid duplicate cd
+            launch_command = rest
+
+    # Build a script that optionally launches, detects the active window, and records a fullscreen video with ffmpeg x11grab
+    _uid = uuid.uuid4().hex
+    video_name = f"{base}_{_uid}.webm"
+    video_out = f"/workspace/.agent/screenshots/{video_name}"
+    # Derive FPS from frame_interval_ms; default to at least 1 fps
+    fps = max(1, int(1000 / max(1, interval)))
+
+    # Prepare optional env exports and working directory change
+    export_snippets: list[str] = []
+    if isinstance(env_map, dict):
+        for k, v in env_map.items():
+            try:
+                ks = str(k)
+                export_snippets.append(f"export {ks}={shlex.quote(str(v))}")
+            except Exception:
+                continue
+    exports = ("; ".join(export_snippets) + "; ") if export_snippets else ""
+
+    cd_snippet = "cd /workspace; "
+    if working_dir:
+        cd_snippet += f"cd -- {shlex.quote(working_dir)}; "
+
+    task_id = uuid.uuid4().hex
+    # Bound what execute_command buffers for long recordings: route the script's output through
+    # `tail -c` into a log file and replay only that tail on exit (preserving the exit code).
+    # fd 3 keeps the exec's real stdout for that replay; background children get it closed
+    # (3>&-) so one that outlives the script cannot hold the exec's output pipe open.
+    script_lines: list[str] = [
+        f"INTERACT_LOG=/tmp/interact_{task_id}.log",
+        "exec 3>&1",
+        "exec > >(tail -c 16384 > \"$INTERACT_LOG\" 3>&-) 2>&1",
+        "TAIL_PID=$!",
+        "trap 'rc=$?; exec 1>&3 2>&3; wait \"$TAIL_PID\" 2>/dev/null; cat \"$INTERACT_LOG\" 2>/dev/null; "
+        "rm -f \"$INTERACT_LOG\"; exit $rc' EXIT",
+        "set -e",
+        "mkdir -p /workspace/.agent/screenshots",
+        # Ensure we operate relative to the user's workspace and desired subdir, with optional env
+        f"{cd_snippet}{exports}".rstrip()
+    ]
+
+    # Optionally launch target command (with optional venv activation)
+    if launch_command:
+        # Activate venv in current shell so $! captures the real process PID of the launched app
+        if venv_cmd:
+            script_lines.append(f"{venv_cmd}")
+        # Launch app in background, capture its PID, and emit a marker for later parsing
+        script_lines.append(
+            f"{launch_command} >/tmp/launch_interact.log 2>&1 3>&- & LAUNCH_PID=$!; echo LAUNCH_PID:$LAUNCH_PID"
+        )
+        # Give the app a brief moment to create its window before we probe/record
+        script_lines.append(f"sleep {max(0, int(post_launch_delay))}")
+
+    # Prepare display and GUI readiness, then detect the most recently active window (non-fatal), and record
+    script_lines += [
+        # Ensure DISPLAY is ready before any xdotool calls
+        "export DISPLAY=:0",
+        "for i in 1 2 3; do xset q >/dev/null 2>&1 && break; sleep 1; done",
+        # After launching, wait a bit more to allow windows to appear before probing
+        "sleep 1",
+        # Non-fatal xdotool queries
+        "set +e",
+        "active_id=\"$(xdotool getactivewindow 2>/dev/null || true)\"",
+        "active_name=\"\"",
+        "active_pid=\"\"",
+        # Ensure LAUNCH_PID is defined even if nothing was launched
+        "LAUNCH_PID=\"${LAUNCH_PID}\"",
+        "if [ -n \"$active_id\" ]; then",
+        "  xdotool windowraise \"$active_id\" >/dev/null 2>&1 || true",
+        "  xdotool windowactivate \"$active_id\" >/dev/null 2>&1 || true",
+        "  xdotool windowfocus \"$active_id\" >/dev/null 2>&1 || true",
+        "  active_name=\"$(xdotool getwindowname \"$active_id\" 2>/dev/null || true)\"",
+        "  active_pid=\"$(xdotool getwindowpid \"$active_id\" 2>/dev/null || true)\"",
+        "fi",
+        # Compare window PID to launch PID (direct or ancestor-descendant)
+        "relation=unknown; pid_match=0;",
+        "if [ -n \"$active_pid\" ] && [ -n \"$LAUNCH_PID\" ]; then",
+        "  if [ \"$active_pid\" = \"$LAUNCH_PID\" ]; then relation=equal; pid_match=1;",
+        "  else",
+        "    cur=\"$active_pid\";",
+        "    for i in 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20; do",
+        "      p=\"$(ps -o ppid= -p \"$cur\" 2>/dev/null | awk '{print $1}')\";",
+        "      [ -z \"$p\" ] && break;",
+        "      [ \"$p\" = \"1\" ] && break;",
+        "      if [ \"$p\" = \"$LAUNCH_PID\" ]; then relation=descendant; pid_match=1; break; fi;",
+        "      cur=\"$p\";",
+        "    done",
+        "  fi",
+        "fi",
+        "echo PID_MATCH:$pid_match",
+        "echo PID_REL:$relation",
+        "set -e",
+    ]
+
+    # After detecting the active window, optionally send user-provided inputs to that window id
+    # New format: key_sequence + delay + type (once|sleep|repeat). Default type='once'.
+    # Backward-compat: if key_sequence not provided, fall back to legacy keys + delay_ms handling.
+    def _sec_from_ms(ms: int) -> str:
         try:
-            n = int(tail)
-            if n < 0:
-                n = 0
+            ms_i = max(0, int(ms))
         except Exception:
-            n = 0
-        # Read the out file; apply tail if requested
-        out_path = f"/workspace/.agent/tmp_scripts/task_{task_id}.out"
-        if n > 0:
-            cmd = f"test -f '{out_path}' && tail -n {n} '{out_path}' || true"
+            ms_i = 0
+        if ms_i % 1000 == 0:
+            return str(ms_i // 1000)
+        val = ms_i / 1000.0
+        s = f"{val:.3f}"
+        # trim trailing zeros and dot
+        while s.endswith("0"):
+            s = s[:-1]
+        if s.endswith("."):
+            s = s[:-1]
+        return s or "0"
+
+    # Separate inputs into pre-capture steps and repeat sequences
+    pre_steps: list[str] = []
+    repeat_cmds: list[str] = []
+
+    for item in inputs:
+        action = (item.type or "once").strip().lower()
+        # Normalize delay: for non-sleep actions, enforce a minimum of 20ms to avoid xdotool timing issues
+        raw_delay = int(item.delay or 0)
+        if action == "sleep":
+            d_ms = max(0, raw_delay)
         else:
-            cmd = f"test -f '{out_path}' && cat '{out_path}' || true"
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        code, out = cm.execute_command(cmd, str(uuid.uuid4()))
-        import json as _json
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "content": out or "", "path": out_path, "hint": _with_progress_reminder("Show a concise excerpt (use tail for long logs) and offer to open or download if needed.")}))]
-    elif name == "potato_task_list":
-        include_status = bool(arguments.get("include_status", False)) if isinstance(arguments, dict) else False
-        # List files matching task_*.pid under tmp_scripts; derive task IDs
-        probe = (
-            "cd /workspace/.agent/tmp_scripts 2>/dev/null || exit 0; "
-            "ls -1 task_*.pid 2>/dev/null | sed -e 's/^task_//' -e 's/\\.pid$//'"
-        )
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        code, out = cm.execute_command(probe, str(uuid.uuid4()))
-        raw_lines = [line.strip() for line in (out or "").splitlines() if line.strip()]
-        def _tid(line: str) -> str:
-            if line.startswith("task_") and line.endswith(".pid"):
-                return line[len("task_"):-len(".pid")]
-            return line
-        task_ids = [_tid(line) for line in raw_lines]
-        payload = {"exit_code": code, "tasks": task_ids}
-        if include_status and task_ids:
-            statuses: dict[str, Any] = {}
-            for tid in task_ids:
-                try:
-                    statuses[tid] = cm.get_task_status(tid)
-                except Exception as e:
-                    statuses[tid] = {"error": str(e)}
-            payload["statuses"] = statuses
-        import json as _json
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(payload))]
-    
-    
-    elif name == "github_clone_repository":
-        if not cm or not cm.is_github_available():
-            raise RuntimeError("GitHub CLI is not available. Set GITHUB_PERSONAL_ACCESS_TOKEN in local/.env")
-        
-        owner = arguments.get("owner")
-        repo = arguments.get("repo")
-        
-        if not owner or not repo:
-            raise ValueError("Both 'owner' and 'repo' are required")
-        
-        # Execute the clone repository command
-        exit_code, output = cm.clone_repository(owner=owner, repo=repo)
-        import json as _json
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": exit_code, "output": output, "hint": _with_progress_reminder("If cloning succeeded, add the repo to your workspace context and consider listing files or opening README next.")}))]
-    
-    elif name == "potato_launch_and_screenshot":
-        data = LaunchAndScreenshotInput(**(arguments or {}))
-        launch_command = data.launch_command
-        delay = int(data.delay_seconds)
-        filename = data.filename
-        working_dir = data.working_dir
-        env_map = data.env or {}
-        venv_cmd = (data.venv or "").strip() or None
-        if not launch_command:
-            raise ValueError("'launch_command' is required")
-
-        # Build the script to launch the app and screenshot
-        import datetime as dt
-        import os
-        shot_dir = "/workspace/.agent/screenshots"
-        # Create directory and run command
-        ts = dt.datetime.now(dt.UTC).strftime("%Y%m%dT%H%M%S")
-        # Always suffix filenames with a UUID to avoid overwrites
-        _uid = uuid.uuid4().hex
-        if filename:
-            root, ext = os.path.splitext(str(filename))
-            ext = ext or ".png"
-            out_name = f"{root}_{_uid}{ext}"
+            d_ms = max(20, raw_delay)
+
+        if action == "sleep":
+            secs = _sec_from_ms(d_ms)
+            pre_steps.append(f"sleep {secs}")
+            continue
+
+        # Build a key invocation for key_sequence
+        if item.key_sequence:
+            raw = item.key_sequence.strip()
+            tokens = [t for t in raw.split() if t]
+            token_args = " ".join(map(shlex.quote, tokens))
+            cmd = f"if [ -n \"$active_id\" ]; then xdotool key --delay {d_ms} --clearmodifiers --window \"$active_id\" {token_args} >/dev/null 2>&1 || true; fi"
         else:
-            out_name = f"screenshot_{ts}_{_uid}.png"
-        out_path = f"{shot_dir}/{out_name}"
-        
-        # Prepare optional env exports and working directory change
-        export_snippets = []
-        if isinstance(env_map, dict):
-            for k, v in env_map.items():
-                try:
-                    ks = str(k)
-                    vs = str(v).replace("'", "'\\''")
-                    export_snippets.append(f"export {ks}='{vs}'")
-                except Exception:
-                    continue
-        exports = ("; ".join(export_snippets) + "; ") if export_snippets else ""
-
-        cd_snippet = ""
-        if working_dir:
-            wd = str(working_dir).replace("'", "'\\''")
-            cd_snippet = f"cd /workspace && cd -- '{wd}' && "
-
-        # Prepend optional venv activation if provided
-        launch_with_venv = f"({venv_cmd} && {launch_command})" if venv_cmd else f"({launch_command})"
-
-        cmd = (
-            "mkdir -p /workspace/.agent/screenshots && "
-            f"{cd_snippet}{exports}"
-            f"{launch_with_venv} >/tmp/launch.log 2>&1 & "
-            f"sleep {delay}; "
-            "export DISPLAY=:0; "
-            "for i in 1 2 3; do xset q >/dev/null 2>&1 && break; sleep 1; done; "
-            "xdotool key XF86Refresh >/dev/null 2>&1 || true; "
-            f"xfce4-screenshooter -f -s '{out_path}'"
-        )
-        task_id = str(uuid.uuid4())
-        timed_out, exit_code, output = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "Launch and capture still running; try again with a larger timeout.", "hint": _with_progress_reminder("Increase timeout_seconds if the app needs longer to render before capture.")}))]
-        import json as _json
-        resp = {"exit_code": exit_code, "screenshot_path": out_path, "output": output,
-                "hint": _with_progress_reminder("Display the screenshot to the user; use the provided 'screenshot_path'.")}
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(resp))]
-    
-    elif name == "potato_workspace_multi_tool_pipeline":
-        # Deprecated: no longer exposed. Provide a clear deprecation message.
-        msg = (
-            "The multi-tool pipeline (potato_workspace_multi_tool_pipeline) is deprecated and no longer exposed. "
-            "Invoke individual tools directly in sequence instead."
-        )
-        return [TextContent(type="text", text=msg)]
-    elif name == "potato_interact_and_record":
-        import json
-        # Parse and validate inputs using Pydantic schema
-        parsed = InteractAndRecordInput(**(arguments or {}))
-        launch_command = (parsed.launch_command or "").strip()
-        venv_cmd = (parsed.venv or "").strip()
-        inputs = parsed.inputs
-        duration = int(parsed.duration_seconds)
-        interval = int(parsed.frame_interval_ms)
-        base = parsed.output_basename
-        working_dir = (parsed.working_dir or "").strip()
-        env_map = parsed.env or {}
-        # Small grace period after launch so windows can appear
-        post_launch_delay = int(parsed.post_launch_delay_seconds)
-
-        # If launch_command starts with a leading 'cd <dir> && ...', extract it as working_dir
-        # so that venv activation occurs in the intended directory and the remaining command runs there.
-        if launch_command:
-            import re as _re
-            m = _re.match(r"^\s*cd\s+(.+?)\s*&&\s*(.*)$", launch_command)
-            if m:
-                wd_raw = m.group(1).strip()
-                rest = (m.group(2) or "").strip() or "true"
-                # Strip quotes around the directory if provided
-                if (wd_raw.startswith("'") and wd_raw.endswith("'")) or (wd_raw.startswith('"') and wd_raw.endswith('"')):
-                    wd_raw = wd_raw[1:-1]
-                # Only adopt if caller didn't explicitly provide working_dir
-                if not working_dir:
-                    working_dir = wd_raw
-                # Remove the leading cd from the launch command to avoid duplicate cd
-                launch_command = rest
-
-        # Build a script that optionally launches, detects the active window, and records a fullscreen video with ffmpeg x11grab
-        _uid = uuid.uuid4().hex
-        video_name = f"{base}_{_uid}.webm"
-        video_out = f"/workspace/.agent/screenshots/{video_name}"
-        # Derive FPS from frame_interval_ms; default to at least 1 fps
-        fps = max(1, int(1000 / max(1, interval)))
-
-        # Prepare optional env exports and working directory change
-        export_snippets: list[str] = []
-        if isinstance(env_map, dict):
-            for k, v in env_map.items():
-                try:
-                    ks = str(k)
-                    vs = str(v).replace("'", "'\\''")
-                    export_snippets.append(f"export {ks}='{vs}'")
-                except Exception:
-                    continue
-        exports = ("; ".join(export_snippets) + "; ") if export_snippets else ""
-
-        cd_snippet = "cd /workspace; "
-        if working_dir:
-            wd = working_dir.replace("'", "'\\''")
-            cd_snippet += f"cd -- '{wd}'; "
+            # No key_sequence provided; skip this item silently
+            continue
 
-        script_lines: list[str] = [
+        if action == "repeat":
+            repeat_cmds.append(cmd)
+        else:
+            pre_steps += ["set +e", cmd, "set -e"]
+
+    # Emit pre-capture steps now (sequential)
+    script_lines += pre_steps
+
+    # Continue with emitting markers and recording
+    script_lines += [
+        # Emit markers so we can parse results easily
+        "echo WIN_NAME:$active_name",
+        "echo WIN_PID:$active_pid",
+        "echo LAUNCH_PID:$LAUNCH_PID",
+        "echo WIN_ID:$active_id",
+        # Determine video size
+        "VSIZE=\"$(xrandr | awk '/\\*/ {print $1; exit}')\"",
+        "if [ -z \"$VSIZE\" ]; then VSIZE=1280x720; fi",
+    ]
+
+    if repeat_cmds:
+        # Start recording in background and loop until it ends, sending repeat sequences
+        script_lines += [
+            f"ffmpeg -y -loglevel error -f x11grab -framerate {fps} -video_size \"$VSIZE\" -i :0.0 -c:v libvpx-vp9 -pix_fmt yuv420p -t {duration} '{video_out}' >/dev/null 2>&1 3>&- & FF_PID=$!",
+            "set +e",
+            "while kill -0 \"$FF_PID\" >/dev/null 2>&1; do",
+        ]
+        # Add repeat commands inside the loop
+        for rc in repeat_cmds:
+            script_lines.append(f"  {rc}")
+        script_lines += [
+            "done",
             "set -e",
-            "mkdir -p /workspace/.agent/screenshots",
-            # Ensure we operate relative to the user's workspace and desired subdir, with optional env
-            f"{cd_snippet}{exports}".rstrip()
+            "wait \"$FF_PID\" 2>/dev/null || true",
+            f"echo 'OUTPUT_VIDEO: {video_out}'",
+        ]
+    else:
+        # Record in the foreground
+        script_lines += [
+            f"ffmpeg -y -loglevel error -f x11grab -framerate {fps} -video_size \"$VSIZE\" -i :0.0 -c:v libvpx-vp9 -pix_fmt yuv420p -t {duration} '{video_out}' >/dev/null 2>&1",
+            f"echo 'OUTPUT_VIDEO: {video_out}'",
         ]
 
-        # Optionally launch target command (with optional venv activation)
-        if launch_command:
-            # Activate venv in current shell so $! captures the real process PID of the launched app
-            if venv_cmd:
-                script_lines.append(f"{venv_cmd}")
-            # Launch app in background, capture its PID, and emit a marker for later parsing
-            script_lines.append(
-                f"{launch_command} >/tmp/launch_interact.log 2>&1 & LAUNCH_PID=$!; echo LAUNCH_PID:$LAUNCH_PID"
-            )
-            # Give the app a brief moment to create its window before we probe/record
-            script_lines.append(f"sleep {max(0, int(post_launch_delay))}")
-
-        # Prepare display and GUI readiness, then detect the most recently active window (non-fatal), and record
+    # If we launched an app, attempt to terminate it gracefully after recording:
+    # 1) SIGINT to the window's client process id
+    # 2) Wait up to 5s; if still running, SIGKILL
+    if launch_command:
         script_lines += [
-            # Ensure DISPLAY is ready before any xdotool calls
-            "export DISPLAY=:0",
-            "for i in 1 2 3; do xset q >/dev/null 2>&1 && break; sleep 1; done",
-            # After launching, wait a bit more to allow windows to appear before probing
-            "sleep 1",
-            # Non-fatal xdotool queries
             "set +e",
-            "active_id=\"$(xdotool getactivewindow 2>/dev/null || true)\"",
-            "active_name=\"\"",
-            "active_pid=\"\"",
-            # Ensure LAUNCH_PID is defined even if nothing was launched
-            "LAUNCH_PID=\"${LAUNCH_PID}\"",
-            "if [ -n \"$active_id\" ]; then",
-            "  xdotool windowraise \"$active_id\" >/dev/null 2>&1 || true",
-            "  xdotool windowactivate \"$active_id\" >/dev/null 2>&1 || true",
-            "  xdotool windowfocus \"$active_id\" >/dev/null 2>&1 || true",
-            "  active_name=\"$(xdotool getwindowname \"$active_id\" 2>/dev/null || true)\"",
-            "  active_pid=\"$(xdotool getwindowpid \"$active_id\" 2>/dev/null || true)\"",
+            # First, try to gracefully stop the window's client process
+            "if [ -n \"$active_pid\" ]; then",
+            "  kill -s INT \"$active_pid\" >/dev/null 2>&1 || true",
             "fi",
-            # Compare window PID to launch PID (direct or ancestor-descendant)
-            "relation=unknown; pid_match=0;",
-            "if [ -n \"$active_pid\" ] && [ -n \"$LAUNCH_PID\" ]; then",
-            "  if [ \"$active_pid\" = \"$LAUNCH_PID\" ]; then relation=equal; pid_match=1;",
-            "  else",
-            "    cur=\"$active_pid\";",
-            "    for i in 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20; do",
-            "      p=\"$(ps -o ppid= -p \"$cur\" 2>/dev/null | awk '{print $1}')\";",
-            "      [ -z \"$p\" ] && break;",
-            "      [ \"$p\" = \"1\" ] && break;",
-            "      if [ \"$p\" = \"$LAUNCH_PID\" ]; then relation=descendant; pid_match=1; break; fi;",
-            "      cur=\"$p\";",
-            "    done",
-            "  fi",
+            # Also signal the originally launched PID if it's different
+            "if [ -n \"$LAUNCH_PID\" ] && [ \"$LAUNCH_PID\" != \"$active_pid\" ]; then",
+            "  kill -s INT \"$LAUNCH_PID\" >/dev/null 2>&1 || true",
             "fi",
-            "echo PID_MATCH:$pid_match",
-            "echo PID_REL:$relation",
+            # Wait up to 5s for both processes to exit
+            "for i in 1 2 3 4 5; do",
+            "  ok=1;",
+            "  if [ -n \"$active_pid\" ]; then ps -p \"$active_pid\" >/dev/null 2>&1 && ok=0; fi;",
+            "  if [ -n \"$LAUNCH_PID\" ]; then ps -p \"$LAUNCH_PID\" >/dev/null 2>&1 && ok=0; fi;",
+            "  [ $ok -eq 1 ] && break;",
+            "  sleep 1;",
+            "done",
+            # Force kill if still alive
+            "if [ -n \"$active_pid\" ]; then ps -p \"$active_pid\" >/dev/null 2>&1 && kill -s KILL \"$active_pid\" >/dev/null 2>&1 || true; fi",
+            "if [ -n \"$LAUNCH_PID\" ]; then ps -p \"$LAUNCH_PID\" >/dev/null 2>&1 && kill -s KILL \"$LAUNCH_PID\" >/dev/null 2>&1 || true; fi",
             "set -e",
         ]
 
-        # After detecting the active window, optionally send user-provided inputs to that window id
-        # New format: key_sequence + delay + type (once|sleep|repeat). Default type='once'.
-        # Backward-compat: if key_sequence not provided, fall back to legacy keys + delay_ms handling.
-        def _sec_from_ms(ms: int) -> str:
-            try:
-                ms_i = max(0, int(ms))
-            except Exception:
-                ms_i = 0
-            if ms_i % 1000 == 0:
-                return str(ms_i // 1000)
-            val = ms_i / 1000.0
-            s = f"{val:.3f}"
-            # trim trailing zeros and dot
-            while s.endswith("0"):
-                s = s[:-1]
-            if s.endswith("."):
-                s = s[:-1]
-            return s or "0"
-
-        # Separate inputs into pre-capture steps and repeat sequences
-        pre_steps: list[str] = []
-        repeat_cmds: list[str] = []
-
-        for item in inputs:
-            action = (item.type or "once").strip().lower()
-            # Normalize delay: for non-sleep actions, enforce a minimum of 20ms to avoid xdotool timing issues
-            raw_delay = int(item.delay or 0)
-            if action == "sleep":
-                d_ms = max(0, raw_delay)
-            else:
-                d_ms = max(20, raw_delay)
-
-            if action == "sleep":
-                secs = _sec_from_ms(d_ms)
-                pre_steps.append(f"sleep {secs}")
-                continue
+    full_script = "\n".join([line for line in script_lines if line])
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    exit_code, output = cm.execute_command(full_script, task_id)
+
+    payload = {"exit_code": exit_code}
+    # Parse detected window info from output
+    wname = None
+    wpid = None
+    wid = None
+    lpid = None
+    pid_match = None
+    pid_rel = None
+    if output:
+        for line in (output or "").splitlines():
+            if line.startswith("WIN_NAME:"):
+                wname = line.split(":", 1)[1].strip()
+            elif line.startswith("WIN_PID:"):
+                wpid = line.split(":", 1)[1].strip()
+            elif line.startswith("WIN_ID:"):
+                wid = line.split(":", 1)[1].strip()
+            elif line.startswith("LAUNCH_PID:"):
+                lpid = line.split(":", 1)[1].strip()
+            elif line.startswith("PID_MATCH:"):
+                try:
+                    pid_match = bool(int(line.split(":", 1)[1].strip()))
+                except Exception:
+                    pid_match = None
+            elif line.startswith("PID_REL:"):
+                pid_rel = line.split(":", 1)[1].strip()
+    payload["window_name"] = wname
+    payload["window_pid"] = wpid
+    payload["window_id"] = wid
+    if lpid is not None:
+        payload["launch_pid"] = lpid
+    if pid_match is not None:
+        payload["pid_match"] = pid_match
+    if pid_rel is not None:
+        payload["pid_relation"] = pid_rel
+    # Always return the container path for media
+    payload["video_path"] = video_out
+    payload["hint"] = _with_progress_reminder("Provide the video to the user; use 'video_path' at /workspace/.agent/screenshots/.")
+    return [TextContent(type="text", text=_dumps(payload))]
 
-            # Build a key invocation for key_sequence
-            if item.key_sequence:
-                raw = item.key_sequence.strip()
-                tokens = [t for t in raw.split() if t]
-                esc_tokens = [t.replace("'", "'\\''") for t in tokens]
-                token_args = " ".join(f"'{t}'" for t in esc_tokens)
-                cmd = f"if [ -n \"$active_id\" ]; then xdotool key --delay {d_ms} --clearmodifiers --window \"$active_id\" {token_args} >/dev/null 2>&1 || true; fi"
-            else:
-                # No key_sequence provided; skip this item silently
-                continue
 
-            if action == "repeat":
-                repeat_cmds.append(cmd)
-            else:
-                pre_steps += ["set +e", cmd, "set -e"]
+@no_type_check
+def _tool_potato_python_run_module(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    data = PythonRunModuleInput(**(arguments or {}))
+    venv = data.venv_path
+    module = data.module
+    args = data.args
+    run_bg = bool(getattr(data, "background", False))
+    if not venv or not module:
+        raise ValueError("'venv_path' and 'module' are required")
+    py = _to_ws_abs(venv).rstrip("/") + "/bin/python"
+    argv = [py, "-m", str(module), *(str(a) for a in args)]
+    cmd = shlex.join(argv)
+    if run_bg:
+        info = container_manager.start_background_task(cmd, uuid.uuid4().hex)
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_dumps({"task_id": info.get("task_id"), "exit_code": info.get("exit_code"), "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop the module.")}))]
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "Module still running; try again with a larger timeout or set background=true.", "Set background=true to get a task_id, then use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop when done."))]
+    logger.info(f"[req={req_id}] tool={name} completed exit_code={code} module={module}")
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Use output to summarize the run results concisely.")}))]
 
-        # Emit pre-capture steps now (sequential)
-        script_lines += pre_steps
 
-        # Continue with emitting markers and recording
-        script_lines += [
-            # Emit markers so we can parse results easily
-            "echo WIN_NAME:$active_name",
-            "echo WIN_PID:$active_pid",
-            "echo LAUNCH_PID:$LAUNCH_PID",
-            "echo WIN_ID:$active_id",
-            # Determine video size
-            "VSIZE=\"$(xrandr | awk '/\\*/ {print $1; exit}')\"",
-            "if [ -z \"$VSIZE\" ]; then VSIZE=1280x720; fi",
-        ]
+@no_type_check
+def _tool_potato_python_run_script(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    data = PythonRunScriptInput(**(arguments or {}))
+    venv = data.venv_path
+    script_path = data.script_path
+    args = data.args
+    run_bg = bool(getattr(data, "background", False))
+    if not venv or not script_path:
+        raise ValueError("'venv_path' and 'script_path' are required")
+    py = _to_ws_abs(venv).rstrip("/") + "/bin/python"
+    sp = _to_ws_abs(script_path)
+    argv = [py, sp, *(str(a) for a in args)]
+    cmd = shlex.join(argv)
+    if run_bg:
+        info = container_manager.start_background_task(cmd, uuid.uuid4().hex)
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_dumps({"task_id": info.get("task_id"), "exit_code": info.get("exit_code"), "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop the script.")}))]
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "Script still running; try again with a larger timeout or set background=true.", "Set background=true to get a task_id, then use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop when done."))]
+    logger.info(f"[req={req_id}] tool={name} completed exit_code={code} script={script_path}")
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Use output to summarize the run results concisely.")}))]
 
-        if repeat_cmds:
-            # Start recording in background and loop until it ends, sending repeat sequences
-            script_lines += [
-                f"ffmpeg -y -loglevel error -f x11grab -framerate {fps} -video_size \"$VSIZE\" -i :0.0 -c:v libvpx-vp9 -pix_fmt yuv420p -t {duration} '{video_out}' >/dev/null 2>&1 & FF_PID=$!",
-                "set +e",
-                "while kill -0 \"$FF_PID\" >/dev/null 2>&1; do",
-            ]
-            # Add repeat commands inside the loop
-            for rc in repeat_cmds:
-                script_lines.append(f"  {rc}")
-            script_lines += [
-                "done",
-                "set -e",
-                "wait \"$FF_PID\" 2>/dev/null || true",
-                f"echo 'OUTPUT_VIDEO: {video_out}'",
-            ]
-        else:
-            # Record in the foreground
-            script_lines += [
-                f"ffmpeg -y -loglevel error -f x11grab -framerate {fps} -video_size \"$VSIZE\" -i :0.0 -c:v libvpx-vp9 -pix_fmt yuv420p -t {duration} '{video_out}' >/dev/null 2>&1",
-                f"echo 'OUTPUT_VIDEO: {video_out}'",
-            ]
-
-        # If we launched an app, attempt to terminate it gracefully after recording:
-        # 1) SIGINT to the window's client process id
-        # 2) Wait up to 5s; if still running, SIGKILL
-        if launch_command:
-            script_lines += [
-                "set +e",
-                # First, try to gracefully stop the window's client process
-                "if [ -n \"$active_pid\" ]; then",
-                "  kill -s INT \"$active_pid\" >/dev/null 2>&1 || true",
-                "fi",
-                # Also signal the originally launched PID if it's different
-                "if [ -n \"$LAUNCH_PID\" ] && [ \"$LAUNCH_PID\" != \"$active_pid\" ]; then",
-                "  kill -s INT \"$LAUNCH_PID\" >/dev/null 2>&1 || true",
-                "fi",
-                # Wait up to 5s for both processes to exit
-                "for i in 1 2 3 4 5; do",
-                "  ok=1;",
-                "  if [ -n \"$active_pid\" ]; then ps -p \"$active_pid\" >/dev/null 2>&1 && ok=0; fi;",
-                "  if [ -n \"$LAUNCH_PID\" ]; then ps -p \"$LAUNCH_PID\" >/dev/null 2>&1 && ok=0; fi;",
-                "  [ $ok -eq 1 ] && break;",
-                "  sleep 1;",
-                "done",
-                # Force kill if still alive
-                "if [ -n \"$active_pid\" ]; then ps -p \"$active_pid\" >/dev/null 2>&1 && kill -s KILL \"$active_pid\" >/dev/null 2>&1 || true; fi",
-                "if [ -n \"$LAUNCH_PID\" ]; then ps -p \"$LAUNCH_PID\" >/dev/null 2>&1 && kill -s KILL \"$LAUNCH_PID\" >/dev/null 2>&1 || true; fi",
-                "set -e",
-            ]
-
-        full_script = "\n".join([line for line in script_lines if line])
-        task_id = str(uuid.uuid4())
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        exit_code, output = cm.execute_command(full_script, task_id)
-
-        payload = {"exit_code": exit_code}
-        # Parse detected window info from output
-        wname = None
-        wpid = None
-        wid = None
-        lpid = None
-        pid_match = None
-        pid_rel = None
-        if output:
-            for line in (output or "").splitlines():
-                if line.startswith("WIN_NAME:"):
-                    wname = line.split(":", 1)[1].strip()
-                elif line.startswith("WIN_PID:"):
-                    wpid = line.split(":", 1)[1].strip()
-                elif line.startswith("WIN_ID:"):
-                    wid = line.split(":", 1)[1].strip()
-                elif line.startswith("LAUNCH_PID:"):
-                    lpid = line.split(":", 1)[1].strip()
-                elif line.startswith("PID_MATCH:"):
-                    try:
-                        pid_match = bool(int(line.split(":", 1)[1].strip()))
-                    except Exception:
-                        pid_match = None
-                elif line.startswith("PID_REL:"):
-                    pid_rel = line.split(":", 1)[1].strip()
-        payload["window_name"] = wname
-        payload["window_pid"] = wpid
-        payload["window_id"] = wid
-        if lpid is not None:
-            payload["launch_pid"] = lpid
-        if pid_match is not None:
-            payload["pid_match"] = pid_match
-        if pid_rel is not None:
-            payload["pid_relation"] = pid_rel
-        # Always return the container path for media
-        payload["video_path"] = video_out
-        payload["hint"] = _with_progress_reminder("Provide the video to the user; use 'video_path' at /workspace/.agent/screenshots/.")
-        return [TextContent(type="text", text=json.dumps(payload, ensure_ascii=False))]
-    elif name == "potato_python_run_module":
-        data = PythonRunModuleInput(**(arguments or {}))
-        venv = data.venv_path
-        module = data.module
-        args = data.args
-        run_bg = bool(getattr(data, "background", False))
-        if not venv or not module:
-            raise ValueError("'venv_path' and 'module' are required")
-        def _norm(p: str) -> str:
-            p = str(p).strip()
-            if p.startswith("/workspace/"):
-                return p
-            if p.startswith("/"):
-                raise ValueError("Absolute paths outside /workspace are not allowed")
-            return f"/workspace/{p}"
-        py = _norm(venv).rstrip("/") + "/bin/python"
-        arg_str = " ".join(["'" + str(a).replace("'", "'\\''") + "'" for a in args])
-        cmd = f"{py} -m {module} {arg_str}".rstrip()
-        if run_bg:
-            info = container_manager.start_background_task(cmd, str(uuid.uuid4()))
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"task_id": info.get("task_id"), "exit_code": info.get("exit_code"), "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop the module.")}))]
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "Module still running; try again with a larger timeout or set background=true.", "hint": _with_progress_reminder("Set background=true to get a task_id, then use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop when done.")}))]
-        import json as _json
-        logger.info(f"[req={req_id}] tool={name} completed exit_code={code} module={module}")
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Use output to summarize the run results concisely.")}))]
-    elif name == "potato_python_run_script":
-        data = PythonRunScriptInput(**(arguments or {}))
-        venv = data.venv_path
-        script_path = data.script_path
-        args = data.args
-        run_bg = bool(getattr(data, "background", False))
-        if not venv or not script_path:
-            raise ValueError("'venv_path' and 'script_path' are required")
-        def _norm(p: str) -> str:
-            p = str(p).strip()
-            if p.startswith("/workspace/"):
-                return p
-            if p.startswith("/"):
-                raise ValueError("Absolute paths outside /workspace are not allowed")
-            return f"/workspace/{p}"
-        py = _norm(venv).rstrip("/") + "/bin/python"
-        sp = _norm(script_path)
-        arg_str = " ".join(["'" + str(a).replace("'", "'\\''") + "'" for a in args])
-        cmd = f"{py} '{sp}' {arg_str}".rstrip()
-        if run_bg:
-            info = container_manager.start_background_task(cmd, str(uuid.uuid4()))
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"task_id": info.get("task_id"), "exit_code": info.get("exit_code"), "hint": _with_progress_reminder("Use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop the script.")}))]
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "Script still running; try again with a larger timeout or set background=true.", "hint": _with_progress_reminder("Set background=true to get a task_id, then use potato_task_status to poll, potato_task_output to tail logs, and potato_task_kill to stop when done.")}))]
-        import json as _json
-        logger.info(f"[req={req_id}] tool={name} completed exit_code={code} script={script_path}")
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Use output to summarize the run results concisely.")}))]
-    elif name == "potato_python_check_syntax":
-        data = PythonCheckSyntaxInput(**(arguments or {}))
-        venv = data.venv_path
-        src = data.source_path
-        if not venv or not src:
-            raise ValueError("'venv_path' and 'source_path' are required")
-        def _norm(p: str) -> str:
-            p = str(p).strip()
-            if p.startswith("/workspace/"):
-                return p
-            if p.startswith("/"):
-                raise ValueError("Absolute paths outside /workspace are not allowed")
-            return f"/workspace/{p}"
-        act = _norm(venv).rstrip("/") + "/bin/activate"
-        sp = _norm(src)
-        # Activate then run py_compile
-        cmd = (
-            f"source '{act}' && python -m py_compile '{sp}'"
-        )
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "py_compile still running; try again with a larger timeout.", "hint": _with_progress_reminder("Large files or slow disks may need more time.")}))]
-        import json as _json
-        logger.info(f"[req={req_id}] tool={name} completed exit_code={code} src={src}")
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If exit_code is 0, the file is syntactically valid; otherwise surface the compile error lines.")}))]
-    elif name == "potato_pytest_run":
-        data = PytestRunInput(**(arguments or {}))
-        venv = data.venv_path
-        args = data.args or []
-        if not venv:
-            raise ValueError("'venv_path' is required")
-        def _norm(p: str) -> str:
-            p = str(p).strip()
-            if p.startswith("/workspace/"):
-                return p
-            if p.startswith("/"):
-                raise ValueError("Absolute paths outside /workspace are not allowed")
-            return f"/workspace/{p}"
-        act = _norm(venv).rstrip("/") + "/bin/activate"
-        arg_str = " ".join(["'" + str(a).replace("'", "'\\''") + "'" for a in args])
-        cmd = f"source '{act}' && pytest {arg_str}".rstrip()
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "pytest still running; try again with a larger timeout.", "hint": _with_progress_reminder("Use -q to reduce output or target specific tests for faster runs.")}))]
-        import json as _json
-        logger.info(f"[req={req_id}] tool={name} completed exit_code={code}")
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Summarize pass/fail counts and point to failing tests if any.")}))]
-    elif name == "potato_list_repositories":
-        import json
-        if not cm:
-            raise RuntimeError("Container manager not initialized")
-        items = cm.list_local_repositories()
-        return [TextContent(type="text", text=json.dumps({"items": items, "hint": _with_progress_reminder("Use these repository entries to navigate or run git operations; avoid dumping full repo trees inline.")}, ensure_ascii=False))]
-    elif name == "potato_git_add":
-        repo_path = arguments.get("repo_path")
-        paths = arguments.get("paths") or []
-        if not repo_path:
-            raise ValueError("'repo_path' is required")
-        path_args = " ".join(["'" + str(p).replace("'", "'\\''") + "'" for p in paths]) if paths else "-A"
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git add {path_args}"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git push still running; try again with a larger timeout.", "hint": _with_progress_reminder("Increase timeout_seconds for slow networks or large pushes.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({
-            "exit_code": code,
-            "output": out,
-            "hint": _with_progress_reminder("Required next step: make a commit. If exit_code is 0, immediately run potato_git_commit with a clear, concise message summarizing what changed and why.")
-        }))]
-    elif name == "potato_git_commit":
-        repo_path = arguments.get("repo_path")
-        message = arguments.get("message")
-        all_flag = bool(arguments.get("all", False))
-        if not repo_path or not message:
-            raise ValueError("'repo_path' and 'message' are required")
-        msg = str(message).replace("'", "'\\''")
-        all_clause = " -a" if all_flag else ""
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git commit{all_clause} -m '{msg}'"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git pull still running; try again with a larger timeout.", "hint": _with_progress_reminder("Increase timeout_seconds for slow networks or large updates.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If commit succeeded, summarize the commit message and next steps (push or create PR).")}))]
-    elif name == "potato_git_push":
-        repo_path = arguments.get("repo_path")
-        remote = arguments.get("remote", "origin")
-        branch = arguments.get("branch")
-        set_upstream = bool(arguments.get("set_upstream", False))
-        if not bool(arguments.get("confirm", False)):
-            import json as _json
-            msg = {
-                "exit_code": 2,
-                "message": "Push requires explicit approval.",
-                "hint": _with_progress_reminder("Do not run this tool unless the user clearly asked to push. Ask the user to confirm and set confirm=true when calling this tool."),
-                "required_action": "Ask for user confirmation to proceed with git push.",
-            }
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps(msg))]
-        if not repo_path:
-            raise ValueError("'repo_path' is required")
-        remote_s = str(remote).replace("'", "'\\''")
-        branch_s = str(branch).replace("'", "'\\''") if branch else ""
-        branch_clause = f" {branch_s}" if branch_s else ""
-        upstream = " -u" if set_upstream else ""
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git push{upstream} '{remote_s}'{branch_clause}"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            import json as _json
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "gh view still running; try again with a larger timeout.", "hint": _with_progress_reminder("Increase timeout_seconds if the GitHub API is slow.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If push succeeded, share the branch and next steps (e.g., open PR). On failure, show the error and suggest pull/rebase.")}))]
-    elif name == "potato_git_pull":
-        repo_path = arguments.get("repo_path")
-        remote = arguments.get("remote", "origin")
-        branch = arguments.get("branch")
-        rebase = bool(arguments.get("rebase", False))
-        if not repo_path:
-            raise ValueError("'repo_path' is required")
-        remote_s = str(remote).replace("'", "'\\''")
-        branch_s = str(branch).replace("'", "'\\''") if branch else ""
-        branch_clause = f" {branch_s}" if branch_s else ""
-        rebase_clause = " --rebase" if rebase else ""
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git pull{rebase_clause} '{remote_s}'{branch_clause}"
-        )
-        import json as _json
+
+@no_type_check
+def _tool_potato_python_check_syntax(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    data = PythonCheckSyntaxInput(**(arguments or {}))
+    venv = data.venv_path
+    src = data.source_path
+    if not venv or not src:
+        raise ValueError("'venv_path' and 'source_path' are required")
+    act = _to_ws_abs(venv).rstrip("/") + "/bin/activate"
+    sp = _to_ws_abs(src)
+    # Activate then run py_compile
+    cmd = (
+        f"source {shlex.quote(act)} && python -m py_compile {shlex.quote(sp)}"
+    )
+    timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "py_compile still running; try again with a larger timeout.", "Large files or slow disks may need more time."))]
+    logger.info(f"[req={req_id}] tool={name} completed exit_code={code} src={src}")
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If exit_code is 0, the file is syntactically valid; otherwise surface the compile error lines.")}))]
+
+
+@no_type_check
+def _tool_potato_pytest_run(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    data = PytestRunInput(**(arguments or {}))
+    venv = data.venv_path
+    args = data.args or []
+    if not venv:
+        raise ValueError("'venv_path' is required")
+    act = _to_ws_abs(venv).rstrip("/") + "/bin/activate"
+    cmd = f"source {shlex.quote(act)} && pytest {shlex.join(map(str, args))}".rstrip()
+    timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "pytest still running; try again with a larger timeout.", "Use -q to reduce output or target specific tests for faster runs."))]
+    logger.info(f"[req={req_id}] tool={name} completed exit_code={code}")
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Summarize pass/fail counts and point to failing tests if any.")}))]
+
+
+@no_type_check
+def _tool_potato_list_repositories(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    items = cm.list_local_repositories()
+    return [TextContent(type="text", text=_dumps({"items": items, "hint": _with_progress_reminder("Use these repository entries to navigate or run git operations; avoid dumping full repo trees inline.")}))]
+
+
+@no_type_check
+def _tool_potato_git_add(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    paths = arguments.get("paths") or []
+    if not repo_path:
+        raise ValueError("'repo_path' is required")
+    argv = ["git", "add", "--", *(str(p) for p in paths)] if paths else ["git", "add", "-A"]
+    timed_out, code, out = _exec_argv_with_timeout(
+        argv, cwd=_repo_abs(repo_path), arguments=arguments
+    )
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git add still running; try again with a larger timeout.", "Increase timeout_seconds for large working trees."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({
+        "exit_code": code,
+        "output": out,
+        "hint": _with_progress_reminder("Required next step: make a commit. If exit_code is 0, immediately run potato_git_commit with a clear, concise message summarizing what changed and why.")
+    }))]
+
+
+@no_type_check
+def _tool_potato_git_commit(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    message = arguments.get("message")
+    all_flag = bool(arguments.get("all", False))
+    if not repo_path or not message:
+        raise ValueError("'repo_path' and 'message' are required")
+    argv = ["git", "commit", *(["-a"] if all_flag else []), "-m", str(message)]
+    timed_out, code, out = _exec_argv_with_timeout(
+        argv, cwd=_repo_abs(repo_path), arguments=arguments
+    )
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git commit still running; try again with a larger timeout.", "Increase timeout_seconds if commit hooks take a while."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If commit succeeded, summarize the commit message and next steps (push or create PR).")}))]
+
+
+@no_type_check
+def _tool_potato_git_push(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    remote = arguments.get("remote", "origin")
+    branch = arguments.get("branch")
+    set_upstream = bool(arguments.get("set_upstream", False))
+    if not bool(arguments.get("confirm", False)):
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_PUSH_CONFIRM_JSON)]
+    if not repo_path:
+        raise ValueError("'repo_path' is required")
+    argv = ["git", "-C", _repo_abs(repo_path), "push", *(["-u"] if set_upstream else []), str(remote)]
+    if branch:
+        argv.append(str(branch))
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git push still running; try again with a larger timeout.", "Increase timeout_seconds for slow networks or large pushes."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If push succeeded, share the branch and next steps (e.g., open PR). On failure, show the error and suggest pull/rebase.")}))]
+
+
+@no_type_check
+def _tool_potato_git_pull(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    repo_path = arguments.get("repo_path")
+    remote = arguments.get("remote", "origin")
+    branch = arguments.get("branch")
+    rebase = bool(arguments.get("rebase", False))
+    if not repo_path:
+        raise ValueError("'repo_path' is required")
+    argv = ["git", "-C", _repo_abs(repo_path), "pull", *(["--rebase"] if rebase else []), str(remote)]
+    if branch:
+        argv.append(str(branch))
+    if not cm:
+        raise RuntimeError("Container manager not initialized")
+    # No timeout for pull (as before); exec the argv directly when the manager supports it
+    exec_argv = getattr(cm, "execute_argv", None)
+    if exec_argv is not None:
+        code, out = exec_argv(argv, uuid.uuid4().hex)
+    else:
+        code, out = cm.execute_command(shlex.join(argv), uuid.uuid4().hex)
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If pull succeeded, summarize changes. If conflicts, advise resolving and committing.")}))]
+
+
+@no_type_check
+def _tool_potato_git_branch_create(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    bname = arguments.get("name")
+    start = (arguments.get("start_point") or "").strip()
+    checkout = bool(arguments.get("checkout", True))
+    if not repo_path or not bname:
+        raise ValueError("'repo_path' and 'name' are required")
+    # git checkout -b <name> [start] / git branch <name> [start]
+    argv = ["git", "-C", _repo_abs(repo_path), *(["checkout", "-b"] if checkout else ["branch"]), str(bname)]
+    if start:
+        argv.append(start)
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git branch create still running; increase timeout_seconds.", "If creating from a remote start point, ensure you have fetched first."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If created successfully, begin committing changes on this branch.")}))]
+
+
+@no_type_check
+def _tool_potato_git_branch_delete(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    bname = arguments.get("name")
+    force = bool(arguments.get("force", False))
+    if not repo_path or not bname:
+        raise ValueError("'repo_path' and 'name' are required")
+    flag = "-D" if force else "-d"
+    argv = ["git", "-C", _repo_abs(repo_path), "branch", flag, str(bname)]
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git branch delete still running; increase timeout_seconds.", "Use force=true to delete an unmerged branch if you are certain."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If deletion succeeded, prune remote branches if needed and update any open PRs.")}))]
+
+
+@no_type_check
+def _tool_potato_git_merge(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    repo_path = arguments.get("repo_path")
+    source = arguments.get("source_branch")
+    target = (arguments.get("target_branch") or "").strip()
+    no_ff = bool(arguments.get("no_ff", True))
+    no_edit = bool(arguments.get("no_edit", True))
+    if not repo_path or not source:
+        raise ValueError("'repo_path' and 'source_branch' are required")
+    repo_cd = _repo_cd_prefix(repo_path)
+    sq = shlex.quote(str(source))
+    tq = shlex.quote(str(target)) if target else ""
+    # If target not provided, detect main/master; fallback to 'main' then 'master'
+    detect_cmd = (
+        f"{repo_cd}"
+        "git rev-parse --verify main >/dev/null 2>&1 && echo main || (git rev-parse --verify master >/dev/null 2>&1 && echo master || echo main)"
+    )
+    if not target:
         if not cm:
             raise RuntimeError("Container manager not initialized")
-        code, out = cm.execute_command(cmd, str(uuid.uuid4()))
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If pull succeeded, summarize changes. If conflicts, advise resolving and committing.")}))]
-    elif name == "potato_git_branch_create":
-        repo_path = arguments.get("repo_path")
-        bname = arguments.get("name")
-        start = (arguments.get("start_point") or "").strip()
-        checkout = bool(arguments.get("checkout", True))
-        if not repo_path or not bname:
-            raise ValueError("'repo_path' and 'name' are required")
-        bq = str(bname).replace("'", "'\\''")
-        start_clause = f" '{start.replace("'", "'\\''")}'" if start else ""
-        if checkout:
-            # git checkout -b <name> [start]
-            cmd = (
-                "cd /workspace && "
-                f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-                f"git checkout -b '{bq}'{start_clause}"
-            )
-        else:
-            # git branch <name> [start]
-            cmd = (
-                "cd /workspace && "
-                f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-                f"git branch '{bq}'{start_clause}"
-            )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git branch create still running; increase timeout_seconds.", "hint": _with_progress_reminder("If creating from a remote start point, ensure you have fetched first.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If created successfully, begin committing changes on this branch.")}))]
-    elif name == "potato_git_branch_delete":
-        repo_path = arguments.get("repo_path")
-        bname = arguments.get("name")
-        force = bool(arguments.get("force", False))
-        if not repo_path or not bname:
-            raise ValueError("'repo_path' and 'name' are required")
-        bq = str(bname).replace("'", "'\\''")
-        flag = "-D" if force else "-d"
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git branch {flag} '{bq}'"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git branch delete still running; increase timeout_seconds.", "hint": _with_progress_reminder("Use force=true to delete an unmerged branch if you are certain.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If deletion succeeded, prune remote branches if needed and update any open PRs.")}))]
-    elif name == "potato_git_merge":
-        repo_path = arguments.get("repo_path")
-        source = arguments.get("source_branch")
-        target = (arguments.get("target_branch") or "").strip()
-        no_ff = bool(arguments.get("no_ff", True))
-        no_edit = bool(arguments.get("no_edit", True))
-        if not repo_path or not source:
-            raise ValueError("'repo_path' and 'source_branch' are required")
-        sq = str(source).replace("'", "'\\''")
-        tq = str(target).replace("'", "'\\''") if target else ""
-        # If target not provided, detect main/master; fallback to 'main' then 'master'
-        detect_cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            "git rev-parse --verify main >/dev/null 2>&1 && echo main || (git rev-parse --verify master >/dev/null 2>&1 && echo master || echo main)"
-        )
-        import json as _json
-        if not target:
-            if not cm:
-                raise RuntimeError("Container manager not initialized")
-            t_to = cm.execute_command(detect_cmd, str(uuid.uuid4()))
-            try:
-                _code, _out = t_to
-            except Exception:
-                _code, _out = (0, "main")
-            target = (_out or "main").strip().splitlines()[0] if _out else "main"
-            tq = str(target).replace("'", "'\\''")
-        # Checkout target, merge source into target with options
-        merge_opts = (" --no-ff" if no_ff else "") + (" --no-edit" if no_edit else "")
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git checkout '{tq}' && git merge{merge_opts} '{sq}'"
-        )
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git merge still running; increase timeout_seconds.", "hint": _with_progress_reminder("Resolve conflicts if present, then commit the merge.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If merge succeeded, summarize the merged changes and consider pushing the updated target branch if approved.")}))]
-    elif name == "potato_git_checkout":
-        repo_path = arguments.get("repo_path")
-        branch = arguments.get("branch")
-        if not repo_path or not branch:
-            raise ValueError("'repo_path' and 'branch' are required")
-        bq = str(branch).replace("'", "'\\''")
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git checkout '{bq}'"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git checkout still running; increase timeout_seconds.", "hint": _with_progress_reminder("Ensure the branch exists locally or fetch remote branches first.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Switched branches. Remember to commit or stash any local changes before switching back if needed.")}))]
-    elif name == "github_get_repository":
-        if not cm or not cm.is_github_available():
-            raise RuntimeError("GitHub CLI is not available. Set GITHUB_PERSONAL_ACCESS_TOKEN in local/.env")
-        owner = arguments.get("owner")
-        repo = arguments.get("repo")
-        if not owner or not repo:
-            raise ValueError("Both 'owner' and 'repo' are required")
-        # Request common fields as JSON
-        fields = "name,description,sshUrl,homepageUrl,url,defaultBranchRef,visibility,createdAt,updatedAt,owner"
-        cmd = f"gh repo view {owner}/{repo} --json {fields}"
-        import json as _json
-        code, out = cm.execute_command(cmd, str(uuid.uuid4()))
-        # Try to parse JSON output from gh; if it fails, return as string
-        parsed = None
+        t_to = cm.execute_command(detect_cmd, uuid.uuid4().hex)
         try:
-            parsed = _json.loads(out) if out else None
+            _code, _out = t_to
         except Exception:
-            parsed = None
-        payload = {"exit_code": code}
-        if parsed is not None:
-            payload["repository"] = parsed
-        else:
-            payload["output"] = out
-        payload["hint"] = _with_progress_reminder("Use repository data to navigate or clone; present key fields (name, description, default branch) to the user concisely.")
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps(payload))]
-    elif name == "potato_git_status":
-        repo_path = arguments.get("repo_path")
-        if not repo_path:
-            raise ValueError("'repo_path' is required")
-        porcelain = bool(arguments.get("porcelain", True))
-        fmt = " --porcelain=v1 -b" if porcelain else ""
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"git status{fmt}"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git status still running; increase timeout_seconds.", "hint": _with_progress_reminder("Large repos may need more time.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Summarize the key changes (modified, added, deleted) and branch info for the user.")}))]
-    elif name == "potato_git_diff":
-        repo_path = arguments.get("repo_path")
-        if not repo_path:
-            raise ValueError("'repo_path' is required")
-        staged = bool(arguments.get("staged", False))
-        name_only = bool(arguments.get("name_only", False))
-        unified = arguments.get("unified", 3)
+            _code, _out = (0, "main")
+        target = (_out or "main").strip().splitlines()[0] if _out else "main"
+        tq = shlex.quote(str(target))
+    # Checkout target, merge source into target with options
+    merge_opts = (" --no-ff" if no_ff else "") + (" --no-edit" if no_edit else "")
+    cmd = (
+        f"{repo_cd}"
+        f"git checkout {tq} && git merge{merge_opts} {sq}"
+    )
+    timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git merge still running; increase timeout_seconds.", "Resolve conflicts if present, then commit the merge."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If merge succeeded, summarize the merged changes and consider pushing the updated target branch if approved.")}))]
+
+
+@no_type_check
+def _tool_potato_git_checkout(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    branch = arguments.get("branch")
+    if not repo_path or not branch:
+        raise ValueError("'repo_path' and 'branch' are required")
+    argv = ["git", "-C", _repo_abs(repo_path), "checkout", str(branch)]
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git checkout still running; increase timeout_seconds.", "Ensure the branch exists locally or fetch remote branches first."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Switched branches. Remember to commit or stash any local changes before switching back if needed.")}))]
+
+
+# (owner, repo) -> (monotonic timestamp, serialized response) for successful gh repo view lookups
+_GH_REPO_CACHE_TTL_S = 60.0
+_gh_repo_cache: dict[tuple[str, str], tuple[float, str]] = {}
+_gh_repo_cache_lock = threading.Lock()
+
+
+def _gh_repo_cache_get(key: tuple[str, str]) -> str | None:
+    now = time.monotonic()
+    with _gh_repo_cache_lock:
+        for k in [k for k, (ts, _) in _gh_repo_cache.items() if now - ts >= _GH_REPO_CACHE_TTL_S]:
+            del _gh_repo_cache[k]
+        hit = _gh_repo_cache.get(key)
+    return hit[1] if hit else None
+
+
+def _gh_repo_cache_put(key: tuple[str, str], text: str) -> None:
+    with _gh_repo_cache_lock:
+        _gh_repo_cache[key] = (time.monotonic(), text)
+
+
+@no_type_check
+def _tool_github_get_repository(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    cm: ContainerManager | None = container_manager
+    if not cm or not cm.is_github_available():
+        raise RuntimeError("GitHub CLI is not available. Set GITHUB_PERSONAL_ACCESS_TOKEN in local/.env")
+    owner = arguments.get("owner")
+    repo = arguments.get("repo")
+    if not owner or not repo:
+        raise ValueError("Both 'owner' and 'repo' are required")
+    cache_key = (str(owner), str(repo))
+    cached = _gh_repo_cache_get(cache_key)
+    if cached is not None:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=cached)]
+    # Request common fields as JSON
+    fields = "name,description,sshUrl,homepageUrl,url,defaultBranchRef,visibility,createdAt,updatedAt,owner"
+    cmd = f"gh repo view {owner}/{repo} --json {fields}"
+    code, out = cm.execute_command(cmd, uuid.uuid4().hex)
+    # Try to parse JSON output from gh; if it fails, return as string.
+    # gh error text never starts with '{', so skip the parse attempt for it outright.
+    parsed = None
+    if out and out.lstrip()[:1] == "{":
         try:
-            u = int(unified)
-            if u < 0:
-                u = 0
-        except Exception:
-            u = 3
-        files = arguments.get("paths") or []
-        files_q = " ".join(["'" + str(p).replace("'", "'\\''") + "'" for p in files])
-        # Use --unified=N to bind the value with the option and add '--' before file paths
-        # to disambiguate files from revisions (prevents errors like: ambiguous argument '3').
-        base = f"git diff{' --cached' if staged else ''}{' --name-only' if name_only else ''} --unified={u}"
-        sep = " -- " if files_q else ""
-        cmd = (
-            "cd /workspace && "
-            f"cd -- '{str(repo_path).replace("'", "'\\''")}' && "
-            f"{base}{sep}{files_q}"
-        )
-        import json as _json
-        timed_out, code, out = _exec_with_timeout(cmd, arguments=arguments)
-        if timed_out:
-            record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-            return [TextContent(type="text", text=_json.dumps({"exit_code": None, "timeout_seconds": arguments.get("timeout_seconds", 120), "message": "git diff still running; increase timeout_seconds.", "hint": _with_progress_reminder("For large diffs, consider name_only=true to list files first.")}))]
-        record_tool_metric(name, int(__t.time()*1000) - __start_ms)
-        return [TextContent(type="text", text=_json.dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If the diff is long, summarize key hunks and call out risky changes; include file list with name_only when helpful.")}))]
-    
+            parsed = _loads(out)
+        except ValueError:
+            parsed = None
+    payload = {"exit_code": code}
+    if parsed is not None:
+        payload["repository"] = parsed
     else:
+        payload["output"] = out
+    payload["hint"] = _with_progress_reminder("Use repository data to navigate or clone; present key fields (name, description, default branch) to the user concisely.")
+    text = _dumps(payload)
+    if code == 0 and parsed is not None:
+        _gh_repo_cache_put(cache_key, text)
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=text)]
+
+
+@no_type_check
+def _tool_potato_git_status(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    if not repo_path:
+        raise ValueError("'repo_path' is required")
+    porcelain = bool(arguments.get("porcelain", True))
+    # Read-only: don't take the index lock for the opportunistic stat-info refresh
+    argv = ["git", "-C", _repo_abs(repo_path), "--no-optional-locks", "status"]
+    if porcelain:
+        argv += ["--porcelain=v1", "-b"]
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git status still running; increase timeout_seconds.", "Large repos may need more time."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("Summarize the key changes (modified, added, deleted) and branch info for the user.")}))]
+
+
+@no_type_check
+def _tool_potato_git_diff(name: str, arguments: Any, req_id: str, start_ns: int) -> list[TextContent]:
+    repo_path = arguments.get("repo_path")
+    if not repo_path:
+        raise ValueError("'repo_path' is required")
+    staged = bool(arguments.get("staged", False))
+    name_only = bool(arguments.get("name_only", False))
+    u = _count_arg(arguments, "unified", 3)
+    files = arguments.get("paths") or []
+    # Use --unified=N to bind the value with the option and add '--' before file paths
+    # to disambiguate files from revisions (prevents errors like: ambiguous argument '3').
+    argv = ["git", "-C", _repo_abs(repo_path), "--no-optional-locks", "diff"]
+    if staged:
+        argv.append("--cached")
+    # --unified only shapes hunks, which --name-only never prints
+    argv.append("--name-only" if name_only else f"--unified={u}")
+    if files:
+        argv += ["--", *(str(p) for p in files)]
+    timed_out, code, out = _exec_argv_with_timeout(argv, arguments=arguments)
+    if timed_out:
+        record_tool_metric(name, _elapsed_ms(start_ns))
+        return [TextContent(type="text", text=_timeout_text(arguments, "git diff still running; increase timeout_seconds.", "For large diffs, consider name_only=true to list files first."))]
+    record_tool_metric(name, _elapsed_ms(start_ns))
+    return [TextContent(type="text", text=_dumps({"exit_code": code, "output": out, "hint": _with_progress_reminder("If the diff is long, summarize key hunks and call out risky changes; include file list with name_only when helpful.")}))]
+
+
+# Handlers kept for old clients but not published by list_tools (so rejected as unknown)
+_UNPUBLISHED_TOOLS = frozenset({"potato_workspace_multi_tool_pipeline"})
+
+# Tool name -> handler. Each handler receives (name, arguments, req_id, start_ns).
+# 'potato_recommended_flow' intentionally disabled
+_TOOL_HANDLERS: dict[str, Callable[[str, Any, str, int], list[TextContent]]] = {
+    "potato_execute_command": _tool_potato_execute_command,
+    "potato_screenshot": _tool_potato_screenshot,
+    "potato_select_venv": _tool_potato_select_venv,
+    "potato_find_venvs": _tool_potato_find_venvs,
+    "potato_task_start": _tool_potato_task_start,
+    "potato_task_status": _tool_potato_task_status,
+    "potato_task_kill": _tool_potato_task_kill,
+    "potato_task_output": _tool_potato_task_output,
+    "potato_task_list": _tool_potato_task_list,
+    "github_clone_repository": _tool_github_clone_repository,
+    "potato_launch_and_screenshot": _tool_potato_launch_and_screenshot,
+    "potato_workspace_multi_tool_pipeline": _tool_potato_workspace_multi_tool_pipeline,
+    "potato_interact_and_record": _tool_potato_interact_and_record,
+    "potato_python_run_module": _tool_potato_python_run_module,
+    "potato_python_run_script": _tool_potato_python_run_script,
+    "potato_python_check_syntax": _tool_potato_python_check_syntax,
+    "potato_pytest_run": _tool_potato_pytest_run,
+    "potato_list_repositories": _tool_potato_list_repositories,
+    "potato_git_add": _tool_potato_git_add,
+    "potato_git_commit": _tool_potato_git_commit,
+    "potato_git_push": _tool_potato_git_push,
+    "potato_git_pull": _tool_potato_git_pull,
+    "potato_git_branch_create": _tool_potato_git_branch_create,
+    "potato_git_branch_delete": _tool_potato_git_branch_delete,
+    "potato_git_merge": _tool_potato_git_merge,
+    "potato_git_checkout": _tool_potato_git_checkout,
+    "github_get_repository": _tool_github_get_repository,
+    "potato_git_status": _tool_potato_git_status,
+    "potato_git_diff": _tool_potato_git_diff,
+}
+
+
+@app.call_tool()
+@no_type_check
+async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Handle tool calls."""
+    # If a tool is not published, fail fast as "Unknown tool".
+    # This also avoids returning container initialization errors for callers probing tool availability.
+    # Mirrors what list_tools publishes without rebuilding the Tool schemas on every call.
+    if (
+        name not in _TOOL_HANDLERS
+        or name in _UNPUBLISHED_TOOLS
+        or (name in _GITHUB_TOOL_NAMES and not _github_tools_available())
+    ):
         raise ValueError(f"Unknown tool: {name}")
 
+    # Only require container_manager for tools that interact with the container
+    container_required = name not in {"potato_select_venv"}
+    if container_required and not container_manager:
+        raise RuntimeError("Container manager not initialized")
+
+    # Add a per-call request ID for structured logging
+    req_id = uuid.uuid4().hex
+    logger.info(f"[req={req_id}] call_tool name={name}")
+
+    start_ns = time.monotonic_ns()
+
+    return _TOOL_HANDLERS[name](name, arguments, req_id, start_ns)
+
+
+# Docker container event actions that mean the sandbox may have gone down
+_WATCHDOG_ACTIONS = frozenset({"die", "kill", "stop", "oom"})
+
+
+def _restart_if_down(cm: ContainerManager | None) -> bool:
+    """Restart the sandbox if it is not running; False when it is still down afterwards."""
+    if not cm or cm.is_container_running():
+        return True
+    logger.warning("Container stopped; attempting to restart...")
+    try:
+        ok = cm.ensure_container_alive()
+    except Exception as e:
+        logger.error(f"Container restart raised: {e}")
+        return False
+    if not ok:
+        return False
+    try:
+        cid = cm.get_container_id()
+    except Exception:
+        cid = None
+    logger.info(f"Container restarted successfully; id={str(cid)[:12] if cid else 'unknown'}")
+    return True
+
+
+def _restart_until_up(cm: ContainerManager | None, max_backoff: float = 30.0) -> None:
+    """Keep restarting the sandbox with exponential backoff until it is running again.
+
+    A dead container emits no further events, so the watchdog cannot wait for the next
+    event to retry a failed restart.
+    """
+    backoff = 1.0
+    while not _restart_if_down(cm):
+        logger.error(f"Container restart failed; retrying in {backoff:.0f}s")
+        time.sleep(backoff)
+        backoff = min(backoff * 2, max_backoff)
+
 
 def initialize_server() -> None:
     """Initialize the server and container."""
@@ -1876,73 +2199,73 @@ def initialize_server() -> None:
         logger.warning(f"Container ensure/start encountered an issue: {e}")
 
     # On startup, repair/cleanup the local tracked repos list by removing entries whose directories are missing
-    try:
-        container_manager.prune_tracked_repositories(dry_run=False)
-    except Exception as e:
-        logger.warning(f"Workspace prune on startup failed: {e}")
+    def _prune_tracked() -> None:
+        try:
+            container_manager.prune_tracked_repositories(dry_run=False)
+        except Exception as e:
+            logger.warning(f"Workspace prune on startup failed: {e}")
 
     # HTTP server removed: artifacts are referenced by absolute container paths only
 
     # Write readiness file for clients/diagnostics
-    try:
-        import datetime as _dt
-        import json as _json
-        import os as _os
-        from pathlib import Path as _Path
-        now = _dt.datetime.now(_dt.timezone.utc).isoformat()
-        running = False
+    def _write_readiness() -> None:
         try:
-            running = bool(container_manager.is_container_running())
-        except Exception:
+            import datetime as _dt
+            import json as _json
+            import os as _os
+            from pathlib import Path as _Path
+            now = _dt.datetime.now(_dt.timezone.utc).isoformat()
             running = False
-        state = {
-            "version": 1,
-            "timestamp": now,
-            "up": True,
-            "container": {
-                "name": getattr(container_manager, "container_name", None),
-                "id": container_manager.get_container_id(),
-                "running": running,
-            },
-            "server": {
-                "pid": _os.getpid(),
-            },
-        }
-        p = _Path(container_manager.workspace_dir) / ".agent" / "potato_ready.json"
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(_json.dumps(state, indent=2))
-        logger.info(f"Wrote readiness state: {p}")
-    except Exception as e:
-        logger.warning(f"Failed to write readiness state file: {e}")
+            try:
+                running = bool(container_manager.is_container_running())
+            except Exception:
+                running = False
+            state = {
+                "version": 1,
+                "timestamp": now,
+                "up": True,
+                "container": {
+                    "name": getattr(container_manager, "container_name", None),
+                    "id": container_manager.get_container_id(),
+                    "running": running,
+                },
+                "server": {
+                    "pid": _os.getpid(),
+                },
+            }
+            p = _Path(container_manager.workspace_dir) / ".agent" / "potato_ready.json"
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_text(_json.dumps(state, indent=2))
+            logger.info(f"Wrote readiness state: {p}")
+        except Exception as e:
+            logger.warning(f"Failed to write readiness state file: {e}")
+
+    # Both are independent I/O (filesystem scan vs. docker inspect + file write); run them side by side
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for fut in [pool.submit(_prune_tracked), pool.submit(_write_readiness)]:
+            fut.result()
 
-    # Start a lightweight watchdog to keep the container alive
-    import threading as _th
-    import time as _time
+    # Start a watchdog that reacts to docker lifecycle events for the container instead of polling
     def _watchdog():
+        backoff = 1.0
         while True:
             try:
-                if container_manager and not container_manager.is_container_running():
-                    logger.warning("Container stopped; attempting to restart...")
-                    ok = container_manager.ensure_container_alive()
-                    if ok:
-                        try:
-                            cid = container_manager.get_container_id()
-                        except Exception:
-                            cid = None
-                        logger.info(f"Container restarted successfully; id={str(cid)[:12] if cid else 'unknown'}")
-                    else:
-                        logger.error("Container restart failed; will retry")
-                # Also a periodic gentle ping via a no-op command to surface issues
-                elif container_manager:
-                    try:
-                        container_manager.execute_command("true", str(uuid.uuid4()))
-                    except Exception:
-                        # If exec fails, try to restart on next loop
-                        pass
+                client = container_manager.client
+                events = client.events(
+                    filters={"type": "container", "container": container_manager.container_name},
+                    decode=True,
+                )
+                # Events that fired while the stream was down are not replayed; check once per (re)connect
+                _restart_until_up(container_manager)
+                backoff = 1.0
+                for ev in events:
+                    if (ev or {}).get("Action") in _WATCHDOG_ACTIONS:
+                        _restart_until_up(container_manager)
             except Exception as e:
                 logger.debug(f"Watchdog error: {e}")
-            _time.sleep(5)
-    _th.Thread(target=_watchdog, daemon=True).start()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+    threading.Thread(target=_watchdog, daemon=True).start()
 
     logger.info("Server initialized successfully")
 
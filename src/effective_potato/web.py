@@ -7,9 +7,10 @@ over Streamable HTTP.
 
 from __future__ import annotations
 
+import bisect
 import logging
 import threading
-from typing import Dict, TypedDict
+from typing import Dict, List, Optional, TypedDict
 
 
 __all__ = [
@@ -21,41 +22,127 @@ __all__ = [
 class Metrics(TypedDict):
     up: int
     requests_total: int
-    tool_calls_total: Dict[str, int]
-    tool_duration_ms: Dict[str, int]
+    # tool name -> [calls_total, duration_ms_sum], updated in place so a sample costs one lookup
+    tools: Dict[str, List[int]]
+    # every tool name seen so far, in sorted order
+    tool_names: List[str]
 
 
+# Each recording thread owns one shard and is its only writer, so recording takes no lock and
+# never shares counters with other threads. Readers sum every shard plus _base, into which the
+# shards of finished threads are folded so their counts survive without the shard map growing
+# with every thread that ever recorded. _metrics_lock guards _base, the shard map and the name
+# index; the latter two change only on a thread's first sample (for a tool).
 _metrics_lock: threading.Lock = threading.Lock()
-# Strongly-typed metrics store
-_metrics: Metrics = {
-    "up": 1,
-    "requests_total": 0,
-    "tool_calls_total": {},
-    "tool_duration_ms": {},
-}
+# Owning thread ident -> that thread's shard
+_shards: Dict[int, Dict[str, List[int]]] = {}
+_base: Dict[str, List[int]] = {}
+# Sorted tool names, kept ordered on insert so rendering never sorts
+_tool_names: List[str] = []
+# Tool name -> escaped '{tool="..."} ' label fragment, built once per name
+_tool_labels: Dict[str, str] = {}
+_tls = threading.local()
+
+# Last rendered exposition text; reused until a sample is recorded after it was built
+_render_lock = threading.Lock()
+_cached_text: Optional[str] = None
+_dirty = True
+
+
+def _new_shard() -> Dict[str, List[int]]:
+    shard: Dict[str, List[int]] = {}
+    ident = threading.get_ident()
+    with _metrics_lock:
+        # Idents are reused: a shard still filed under this one belongs to a finished thread
+        stale = _shards.pop(ident, None)
+        if stale is not None:
+            _merge(_base, stale)
+        _shards[ident] = shard
+    _tls.shard = shard
+    return shard
+
+
+def _label_value(value: str) -> str:
+    """Escape a Prometheus label value (backslash, double quote, newline)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _register_name(name: str) -> None:
+    with _metrics_lock:
+        i = bisect.bisect_left(_tool_names, name)
+        if i == len(_tool_names) or _tool_names[i] != name:
+            _tool_labels[name] = f'{{tool="{_label_value(name)}"}} '
+            _tool_names.insert(i, name)
 
 
 def record_tool_metric(name: str, duration_ms: int) -> None:
+    global _dirty
+    shard = getattr(_tls, "shard", None)
+    if shard is None:
+        shard = _new_shard()
+    cell = shard.get(name)
+    if cell is None:
+        cell = shard[name] = [0, 0]
+        _register_name(name)
+    cell[0] += 1
+    cell[1] += max(0, int(duration_ms))
+    _dirty = True
+
+
+def _merge(into: Dict[str, List[int]], shard: Dict[str, List[int]]) -> None:
+    """Add a shard's [count, total_ms] cells into another tool -> cell map."""
+    # list() copies the items in one step, so a concurrent insert by the owner cannot break iteration
+    for name, (count, total_ms) in list(shard.items()):
+        cell = into.get(name)
+        if cell is None:
+            into[name] = [count, total_ms]
+        else:
+            cell[0] += count
+            cell[1] += total_ms
+
+
+def _snapshot() -> Metrics:
+    """Sum _base and all live thread shards into one Metrics view, folding finished threads into _base."""
+    tools: Dict[str, List[int]] = {}
     with _metrics_lock:
-        _metrics["requests_total"] = _metrics["requests_total"] + 1
-        calls = _metrics["tool_calls_total"]
-        total_ms = _metrics["tool_duration_ms"]
-        calls[name] = calls.get(name, 0) + 1
-        total_ms[name] = total_ms.get(name, 0) + max(0, int(duration_ms))
+        # Enumerated under the lock: any thread that registered a shard has started and is listed
+        live = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in _shards if i not in live]:
+            _merge(_base, _shards.pop(ident))
+        _merge(tools, _base)
+        for shard in _shards.values():
+            _merge(tools, shard)
+        names = list(_tool_names)
+    return {
+        "up": 1,
+        "requests_total": sum(count for count, _total_ms in tools.values()),
+        "tools": tools,
+        "tool_names": names,
+    }
 
 
 def render_metrics_text() -> str:
-    lines = [
-        f"effective_potato_up {_metrics['up']}",
-        f"effective_potato_requests_total {_metrics['requests_total']}",
-    ]
-    calls: Dict[str, int] = _metrics["tool_calls_total"] or {}
-    for name, count in sorted(calls.items()):
-        lines.append(f"effective_potato_tool_calls_total{{tool=\"{name}\"}} {count}")
-    durs: Dict[str, int] = _metrics["tool_duration_ms"] or {}
-    for name, total_ms in sorted(durs.items()):
-        lines.append(f"effective_potato_tool_duration_ms_sum{{tool=\"{name}\"}} {total_ms}")
-    return "\n".join(lines) + "\n"
+    global _cached_text, _dirty
+    with _render_lock:
+        if not _dirty and _cached_text is not None:
+            return _cached_text
+        # Clear before reading so samples recorded mid-render mark the new text stale again
+        _dirty = False
+        _cached_text = _render()
+        return _cached_text
+
+
+def _render() -> str:
+    metrics = _snapshot()
+    tools = metrics["tools"]
+    cells = [(_tool_labels[name], tools[name]) for name in metrics["tool_names"]]
+    return "\n".join([
+        f"effective_potato_up {metrics['up']}",
+        f"effective_potato_requests_total {metrics['requests_total']}",
+        *[f"effective_potato_tool_calls_total{label}{cell[0]}" for label, cell in cells],
+        *[f"effective_potato_tool_duration_ms_sum{label}{cell[1]}" for label, cell in cells],
+        "",
+    ])
 
 
 def get_http_log_level():  # retained for compatibility if used elsewhere
@@ -0,0 +1,39 @@
+"""Shared fixtures for the unit tests."""
+
+import docker
+import pytest
+
+from effective_potato import server
+from tests.support.fake_docker import FakeDockerClient
+from tests.support.fakes import FakeCM
+
+
+@pytest.fixture(autouse=True)
+def _no_real_docker(request, monkeypatch):
+    """Hand unit tests a FakeDockerClient from docker.from_env; integration tests keep the real one.
+
+    ContainerManager connects in __init__, so without this every unit test that builds one
+    needs a reachable daemon even though it only exercises host-side file handling.
+    """
+    if request.node.get_closest_marker("integration") is None:
+        monkeypatch.setattr(docker, "from_env", lambda *args, **kwargs: FakeDockerClient())
+
+
+@pytest.fixture(scope="session")
+def shared_sample_env(tmp_path_factory):
+    """A sample.env written once per session.
+
+    ContainerManager only mentions the sample file in its missing-.env hint and never
+    reads or writes it, so every test can point at the same copy.
+    """
+    sample_env = tmp_path_factory.mktemp("sample") / "sample.env"
+    sample_env.write_text("# Sample environment file\n")
+    return sample_env
+
+
+@pytest.fixture
+def fake_cm(monkeypatch):
+    """A FakeCM installed as the server's container manager for the duration of the test."""
+    fake = FakeCM()
+    monkeypatch.setattr(server, "container_manager", fake)
+    return fake
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+import docker
+import pytest
+import requests
+
+from effective_potato.container import ContainerManager
+
+# Everything the image build reads from the context (see the COPY lines in Dockerfile)
+_IMAGE_INPUTS = (
+    "Dockerfile.base",
+    "Dockerfile",
+    "scripts/entrypoint.sh",
+    "scripts/xserver-entry.sh",
+    "scripts/supervisor/xserver.conf",
+)
+
+
+def _image_digest() -> str:
+    """Short content hash of the image build inputs, used as the test image tag."""
+    h = hashlib.blake2b(digest_size=6)
+    for rel in _IMAGE_INPUTS:
+        h.update(rel.encode())
+        h.update(Path(rel).read_bytes())
+    return h.hexdigest()
+
+
+@pytest.fixture(scope="session")
+def require_docker():
+    """Skip unless integration tests are enabled and the Docker daemon answers a ping.
+
+    A short-timeout ping fails in milliseconds when the socket is missing, instead of letting
+    the image build or container start run into the client's much longer timeouts.
+    """
+    if os.environ.get("POTATO_IT_ENABLE", "0") not in ("1", "true", "yes"):
+        pytest.skip("Integration tests disabled. Set POTATO_IT_ENABLE=1 to run.")
+    try:
+        client = docker.from_env(timeout=3)
+        try:
+            client.ping()
+        finally:
+            client.close()
+    except (docker.errors.DockerException, requests.exceptions.RequestException) as e:
+        pytest.skip(f"Docker daemon unavailable: {e}")
+
+
+@pytest.fixture(scope="session")
+def live_container_manager(require_docker):
+    """A built image and running sandbox container shared by the whole integration session.
+
+    Tests that only exec into the container use this instead of building and starting their
+    own; each isolates its files in a per-test subdirectory of ``cm.workspace_dir``. The image
+    is tagged with a hash of its build inputs and only rebuilt when no image has that tag yet.
+    """
+    # Create under project root to avoid host /tmp mount constraints on some systems
+    with tempfile.TemporaryDirectory(dir=str(Path.cwd())) as ws:
+        # os.devnull reads as an empty env file, so no .env/sample.env needs to be written
+        cm = ContainerManager(
+            workspace_dir=ws,
+            env_file=os.devnull,
+            sample_env_file=os.devnull,
+            image_name=f"{os.environ.get('POTATO_IMAGE_NAME', 'effective-potato-ubuntu')}-it-{_image_digest()}",
+            # Each xdist worker runs its own session, so tag the container with the worker id
+            container_name=f"effective-potato-sandbox-it-{os.environ.get('PYTEST_XDIST_WORKER', 'main')}-{secrets.token_hex(4)}",
+        )
+        try:
+            cm.client.images.get(cm.image_name)
+        except docker.errors.ImageNotFound:
+            cm.build_image()
+        cm.start_container()
+        try:
+            yield cm
+        finally:
+            cm.cleanup()
+
+
+@pytest.fixture
+def seed_files():
+    """Return a helper that writes {relative path: text} under a root, creating each directory once."""
+    def _seed(root: Path, files: dict[str, str]) -> None:
+        for d in {os.path.dirname(rel) for rel in files}:
+            os.makedirs(root / d, exist_ok=True)
+        for rel, text in files.items():
+            (root / rel).write_text(text)
+    return _seed
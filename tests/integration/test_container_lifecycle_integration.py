@@ -1,7 +1,7 @@
 import os
 import tempfile
 from pathlib import Path
-import uuid
+import secrets
 
 import pytest
 
@@ -11,26 +11,18 @@ from effective_potato.container import ContainerManager
 @pytest.mark.integration
 @pytest.mark.timeout(600)
 @pytest.mark.skipif(os.environ.get("POTATO_IT_ENABLE", "0") not in ("1", "true", "yes"), reason="Integration tests disabled. Set POTATO_IT_ENABLE=1 to run.")
-def test_container_lifecycle_end_to_end():
+def test_container_lifecycle_end_to_end(require_docker):
     # Use a unique workspace and container name to avoid conflicts on shared hosts
-    with tempfile.TemporaryDirectory(dir=str(Path.cwd())) as tmp:
-        ws = Path(tmp) / "workspace"
-        ws.mkdir(parents=True, exist_ok=True)
-
-        unique = uuid.uuid4().hex[:8]
+    with tempfile.TemporaryDirectory(dir=str(Path.cwd())) as ws:
+        unique = secrets.token_hex(4)
         cname = f"effective-potato-sandbox-it-{unique}"
         image = os.environ.get("POTATO_IMAGE_NAME", "effective-potato-ubuntu")
 
-        # Ensure env file exists (optional)
-        env_file = Path(tmp) / ".env"
-        env_file.write_text("")
-        sample_env = Path(tmp) / "sample.env"
-        sample_env.write_text("# sample\n")
-
         cm = ContainerManager(
-            workspace_dir=str(ws),
-            env_file=str(env_file),
-            sample_env_file=str(sample_env),
+            workspace_dir=ws,
+            # The env file is optional; os.devnull reads as an empty one
+            env_file=os.devnull,
+            sample_env_file=os.devnull,
             image_name=image,
             container_name=cname,
         )
@@ -41,12 +33,12 @@ def test_container_lifecycle_end_to_end():
 
         try:
             # Sanity exec inside container
-            code, out = cm.execute_command("echo hello && whoami && pwd", f"it_{uuid.uuid4()}")
+            code, out = cm.execute_command("echo hello && whoami && pwd", f"it_{secrets.token_hex(4)}")
             assert code == 0
             assert "hello" in out
 
             # Verify workspace mount exists from inside container
-            code2, out2 = cm.execute_command("test -d /workspace && echo MOUNT_OK", f"it_{uuid.uuid4()}")
+            code2, out2 = cm.execute_command("test -d /workspace && echo MOUNT_OK", f"it_{secrets.token_hex(4)}")
             assert code2 == 0
             assert "MOUNT_OK" in out2
         finally:
@@ -1,7 +1,7 @@
 import os
 import tempfile
 from pathlib import Path
-import uuid
+import secrets
 import time
 import json
 
@@ -12,17 +12,12 @@ from effective_potato.container import ContainerManager
 
 
 @pytest.mark.integration
-@pytest.mark.asyncio
 @pytest.mark.skipif(os.environ.get("POTATO_IT_ENABLE", "0") not in ("1", "true", "yes"), reason="Integration tests disabled. Set POTATO_IT_ENABLE=1 to run.")
-async def test_server_watchdog_restarts_and_collects_diagnostics():
+async def test_server_watchdog_restarts_and_collects_diagnostics(require_docker):
     with tempfile.TemporaryDirectory(dir=str(Path.cwd())) as tmp:
-        ws = Path(tmp) / "workspace"
-        ws.mkdir(parents=True, exist_ok=True)
+        ws = Path(tmp)
 
-        env_file = Path(tmp) / ".env"; env_file.write_text("")
-        sample_env = Path(tmp) / "sample.env"; sample_env.write_text("# sample\n")
-
-        unique = uuid.uuid4().hex[:8]
+        unique = secrets.token_hex(4)
         cname = f"effective-potato-sandbox-it-{unique}"
         image = os.environ.get("POTATO_IMAGE_NAME", "effective-potato-ubuntu")
 
@@ -31,8 +26,8 @@ async def test_server_watchdog_restarts_and_collects_diagnostics():
         # Initialize a fresh container manager and inject into server
         cm = ContainerManager(
             workspace_dir=str(ws),
-            env_file=str(env_file),
-            sample_env_file=str(sample_env),
+            env_file=os.devnull,
+            sample_env_file=os.devnull,
             image_name=image,
             container_name=cname,
         )
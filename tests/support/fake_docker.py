@@ -0,0 +1,81 @@
+"""In-process stand-ins for the docker SDK client, so unit tests never reach a daemon."""
+
+import docker
+
+
+class FakeContainer:
+    """An exited, OOM-killed container as the SDK would report it."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.id = "abcdef1234567890"
+        self.attrs = {
+            "Name": name,
+            "State": {
+                "Status": "exited",
+                "Running": False,
+                "Paused": False,
+                "Restarting": False,
+                "OOMKilled": True,
+                "Dead": False,
+                "ExitCode": 137,
+                "Error": "",
+                "StartedAt": "2025-10-06T01:23:45Z",
+                "FinishedAt": "2025-10-06T01:25:00Z",
+            },
+        }
+
+    def reload(self):
+        return None
+
+    def logs(self, timestamps=True, tail=2000):
+        return (b"2025-10-06T01:24:59Z app[1]: running...\n"
+                b"2025-10-06T01:25:00Z kernel: Out of memory: Kill process 1 (app) score 100 or sacrifice child\n")
+
+
+class FakeAPI:
+    def events(self, filters=None, decode=True, since=None):
+        # Yield a small set of fake events
+        yield {
+            "status": "die",
+            "id": "abcdef1234567890",
+            "time": 1696555500,
+            "Type": "container",
+            "Action": "die",
+            "Actor": {
+                "ID": "abcdef1234567890",
+                "Attributes": {
+                    "name": "effective-potato-sandbox",
+                    "exitCode": "137",
+                    "oom-kill": "true",
+                    "image": "effective-potato-ubuntu",
+                },
+            },
+        }
+
+
+class FakeContainers:
+    def __init__(self, name: str | None = None):
+        self._name = name
+
+    def get(self, name: str):
+        if name != self._name:
+            raise docker.errors.NotFound(f"No such container: {name}")
+        return FakeContainer(name)
+
+
+class FakeImages:
+    def get(self, name: str):
+        raise docker.errors.ImageNotFound(f"No such image: {name}")
+
+
+class FakeDockerClient:
+    """A client that knows one container (``name``), no images, and a canned event stream."""
+
+    def __init__(self, name: str | None = None):
+        self.containers = FakeContainers(name)
+        self.images = FakeImages()
+        self.api = FakeAPI()
+
+    def close(self):
+        return None
@@ -0,0 +1,41 @@
+"""Test doubles for the container manager the server tools talk to."""
+
+import shlex
+from typing import Callable, Optional
+
+
+class FakeCM:
+    """Stands in for ContainerManager and records what the tools ask it to run.
+
+    Every ``execute_command`` call is appended to ``calls`` as ``(command, task_id, extra_env)``
+    and answered with ``result``, or with ``script(command)`` when a test needs the reply to
+    depend on the command. ``execute_argv`` calls are recorded in ``argv_calls`` as
+    ``(argv, workdir, extra_env)`` and also appended to ``calls`` as the equivalent shell
+    command, so ``last_cmd`` covers both paths. Background tasks are recorded in ``started``.
+    """
+
+    def __init__(self, output: str = "OK", exit_code: int = 0):
+        self.calls: list[tuple[str, str, Optional[dict]]] = []
+        self.argv_calls: list[tuple[list[str], Optional[str], Optional[dict]]] = []
+        self.started: list[dict] = []
+        self.result = (exit_code, output)
+        self.script: Optional[Callable[[str], tuple[int, str]]] = None
+
+    @property
+    def last_cmd(self) -> Optional[str]:
+        return self.calls[-1][0] if self.calls else None
+
+    def execute_command(self, command: str, task_id: str, extra_env=None):
+        self.calls.append((command, task_id, extra_env))
+        return self.script(command) if self.script is not None else self.result
+
+    def execute_argv(self, argv: list[str], task_id: str, *, workdir=None, extra_env=None):
+        self.argv_calls.append((list(argv), workdir, extra_env))
+        command = shlex.join(argv)
+        if workdir:
+            command = f"cd -- {shlex.quote(workdir)} && {command}"
+        return self.execute_command(command, task_id, extra_env)
+
+    def start_background_task(self, command: str, task_id: str, extra_env=None):
+        self.started.append({"cmd": command, "task_id": task_id, "env": extra_env})
+        return {"task_id": task_id, "exit_code": 0}
@@ -1,91 +1,105 @@
 """Tests for container management functionality."""
 
 import os
-import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 import pytest
 from effective_potato.container import ContainerManager, validate_and_load_env_file
 
 
 @pytest.fixture
-def temp_workspace():
+def temp_workspace(tmp_path):
     """Create a temporary workspace directory."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yield tmpdir
+    return str(tmp_path)
 
 
-@pytest.fixture
-def temp_env_files():
-    """Create temporary environment files."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        env_file = Path(tmpdir) / ".env"
-        sample_env = Path(tmpdir) / "sample.env"
-        sample_env.write_text("# Sample environment file\n")
-        yield env_file, sample_env
+@pytest.fixture(scope="session")
+def temp_env_files(tmp_path_factory, shared_sample_env):
+    """Create temporary environment files (a missing .env and the shared sample.env)."""
+    return tmp_path_factory.mktemp("env") / ".env", shared_sample_env
 
 
-def test_validate_and_load_env_file_valid():
+def test_validate_and_load_env_file_valid(tmp_path):
     """Test loading a valid .env file."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text(
-            "VAR1=value1\n"
-            "VAR2=value2\n"
-            "VAR_WITH_QUOTES=\"quoted value\"\n"
-            "VAR_WITH_SINGLE_QUOTES='single quoted'\n"
-            "# This is a comment\n"
-            "\n"
-            "VAR3=value3\n"
-            "export VAR4=value4\n"
-        )
-        
-        env_vars = validate_and_load_env_file(env_file)
-        
-        assert len(env_vars) == 6
-        assert env_vars["VAR1"] == "value1"
-        assert env_vars["VAR2"] == "value2"
-        assert env_vars["VAR_WITH_QUOTES"] == "quoted value"
-        assert env_vars["VAR_WITH_SINGLE_QUOTES"] == "single quoted"
-        assert env_vars["VAR3"] == "value3"
-        assert env_vars["VAR4"] == "value4"
-
-
-def test_validate_and_load_env_file_empty():
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "VAR1=value1\n"
+        "VAR2=value2\n"
+        "VAR_WITH_QUOTES=\"quoted value\"\n"
+        "VAR_WITH_SINGLE_QUOTES='single quoted'\n"
+        "# This is a comment\n"
+        "\n"
+        "VAR3=value3\n"
+        "export VAR4=value4\n"
+    )
+    
+    env_vars = validate_and_load_env_file(env_file)
+    
+    assert len(env_vars) == 6
+    assert env_vars["VAR1"] == "value1"
+    assert env_vars["VAR2"] == "value2"
+    assert env_vars["VAR_WITH_QUOTES"] == "quoted value"
+    assert env_vars["VAR_WITH_SINGLE_QUOTES"] == "single quoted"
+    assert env_vars["VAR3"] == "value3"
+    assert env_vars["VAR4"] == "value4"
+
+
+def test_validate_and_load_env_file_empty(tmp_path):
     """Test loading an empty .env file."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text("")
-        
-        env_vars = validate_and_load_env_file(env_file)
-        
-        assert len(env_vars) == 0
+    env_file = tmp_path / ".env"
+    env_file.write_text("")
+    
+    env_vars = validate_and_load_env_file(env_file)
+    
+    assert len(env_vars) == 0
 
 
-def test_validate_and_load_env_file_nonexistent():
+def test_validate_and_load_env_file_nonexistent(tmp_path):
     """Test loading a non-existent .env file."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        env_file = Path(tmpdir) / ".env"
-        
-        env_vars = validate_and_load_env_file(env_file)
-        
-        assert len(env_vars) == 0
+    env_file = tmp_path / ".env"
+    
+    env_vars = validate_and_load_env_file(env_file)
+    
+    assert len(env_vars) == 0
 
 
-def test_validate_and_load_env_file_invalid():
+def test_validate_and_load_env_file_invalid(tmp_path):
     """Test that invalid content raises ValueError."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text(
-            "VAR1=value1\n"
-            "This is not a valid line\n"
-            "VAR2=value2\n"
-        )
-        
-        with pytest.raises(ValueError) as exc_info:
-            validate_and_load_env_file(env_file)
-        
-        assert "Invalid content" in str(exc_info.value)
-        assert "line 2" in str(exc_info.value)
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "VAR1=value1\n"
+        "This is not a valid line\n"
+        "VAR2=value2\n"
+    )
+    
+    with pytest.raises(ValueError) as exc_info:
+        validate_and_load_env_file(env_file)
+    
+    assert "Invalid content" in str(exc_info.value)
+    assert "line 2" in str(exc_info.value)
+
+
+def test_validate_and_load_env_file_line_numbers_and_empty_values(tmp_path):
+    """Leading blank lines count toward line numbers; empty quoted values stay empty."""
+    env_file = tmp_path / ".env"
+    env_file.write_text('EMPTY=""\nBARE=\n')
+    assert validate_and_load_env_file(env_file) == {"EMPTY": "", "BARE": ""}
+
+    env_file.write_text("\n\nVAR1=value1\nnot valid\n")
+    with pytest.raises(ValueError, match="line 4"):
+        validate_and_load_env_file(env_file)
+
+
+def test_validate_and_load_env_file_reparses_only_when_changed(tmp_path):
+    """Unchanged files come from the cache as fresh copies; edits are picked up."""
+    env_file = tmp_path / ".env"
+    env_file.write_text("VAR1=value1\n")
+    first = validate_and_load_env_file(env_file)
+    first["VAR1"] = "mutated"
+    assert validate_and_load_env_file(env_file) == {"VAR1": "value1"}
+
+    env_file.write_text("VAR1=value1\nVAR2=value2\n")
+    assert validate_and_load_env_file(env_file) == {"VAR1": "value1", "VAR2": "value2"}
 
 
 def test_container_manager_initialization(temp_workspace, temp_env_files):
@@ -146,14 +160,15 @@ def test_execute_command_creates_script(temp_workspace, temp_env_files):
         sample_env_file=str(sample_env),
     )
 
-    # Create a mock script to test script creation logic
     task_id = "test123"
     command = "echo 'Hello World'"
     script_dir = Path(temp_workspace) / ".agent" / "tmp_scripts"
     script_path = script_dir / f"task_{task_id}.sh"
 
-    # Write the script manually to test the logic
-    script_content = f"#!/bin/bash\n\n{command}\n"
+    # Write the script the way execute_command does, minus the container exec
+    script_content = manager._build_script_content(command)
+    assert script_content == f"#!/bin/bash\n\n{command}\n"
+    assert manager._build_script_content(command + "\n") == script_content
     script_path.write_text(script_content)
     script_path.chmod(0o755)
 
@@ -162,8 +177,9 @@ def test_execute_command_creates_script(temp_workspace, temp_env_files):
     assert os.access(script_path, os.X_OK)  # Check it's executable
 
 
-def test_cleanup_removes_script_files(temp_workspace, temp_env_files):
-    """Test that cleanup removes all script files."""
+@pytest.mark.parametrize("n", [1, 3])
+def test_cleanup_removes_script_files(temp_workspace, temp_env_files, n):
+    """Test that cleanup removes every leftover task script, whether one or several."""
     env_file, sample_env = temp_env_files
     manager = ContainerManager(
         workspace_dir=temp_workspace,
@@ -173,123 +189,73 @@ def test_cleanup_removes_script_files(temp_workspace, temp_env_files):
 
     # Create some mock script files
     script_dir = Path(temp_workspace) / ".agent" / "tmp_scripts"
-    script1 = script_dir / "task_test1.sh"
-    script2 = script_dir / "task_test2.sh"
-    script3 = script_dir / "task_test3.sh"
-    
-    script1.write_text("#!/bin/bash\necho 'test1'\n")
-    script2.write_text("#!/bin/bash\necho 'test2'\n")
-    script3.write_text("#!/bin/bash\necho 'test3'\n")
-    
-    # Verify scripts exist
-    assert script1.exists()
-    assert script2.exists()
-    assert script3.exists()
-    
-    # Run cleanup
+    scripts = [script_dir / f"task_test{i}.sh" for i in range(n)]
+    for script in scripts:
+        script.write_text(f"#!/bin/bash\necho '{script.stem}'\n")
+    assert all(script.exists() for script in scripts)
+
     manager.cleanup()
-    
-    # Verify scripts are removed
-    assert not script1.exists()
-    assert not script2.exists()
-    assert not script3.exists()
 
+    assert not any(script.exists() for script in scripts)
 
-def test_script_cleanup_after_execution(temp_workspace, temp_env_files):
-    """Test that scripts are cleaned up immediately after execution."""
-    env_file, sample_env = temp_env_files
-    manager = ContainerManager(
-        workspace_dir=temp_workspace,
-        env_file=str(env_file),
-        sample_env_file=str(sample_env),
-    )
 
-    # Manually create and execute a script to simulate the execute_command behavior
-    task_id = "cleanup_test"
-    script_dir = Path(temp_workspace) / ".agent" / "tmp_scripts"
-    script_path = script_dir / f"task_{task_id}.sh"
+def test_container_manager_loads_env_vars(tmp_path, shared_sample_env):
+    """Test that ContainerManager loads environment variables from .env file."""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
     
-    # Create the script
-    script_path.write_text("#!/bin/bash\necho 'test'\n")
-    assert script_path.exists()
+    env_file = tmp_path / ".env"
+    env_file.write_text("TEST_VAR1=value1\nTEST_VAR2=value2\n")
     
-    # Simulate cleanup after execution (mimicking what execute_command does)
-    if script_path.exists():
-        script_path.unlink()
+    manager = ContainerManager(
+        workspace_dir=str(workspace),
+        env_file=str(env_file),
+        sample_env_file=str(shared_sample_env),
+    )
     
-    # Verify script is removed
-    assert not script_path.exists()
+    assert len(manager.env_vars) == 2
+    assert manager.env_vars["TEST_VAR1"] == "value1"
+    assert manager.env_vars["TEST_VAR2"] == "value2"
 
 
-def test_container_manager_loads_env_vars():
-    """Test that ContainerManager loads environment variables from .env file."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        workspace = Path(tmpdir) / "workspace"
-        workspace.mkdir()
-        
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text("TEST_VAR1=value1\nTEST_VAR2=value2\n")
-        
-        sample_env = Path(tmpdir) / "sample.env"
-        sample_env.write_text("# Sample\n")
-        
-        manager = ContainerManager(
+def test_container_manager_invalid_env_file_raises_error(tmp_path, shared_sample_env):
+    """Test that invalid .env file raises ValueError."""
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    
+    env_file = tmp_path / ".env"
+    env_file.write_text("VAR1=value1\nINVALID CONTENT\n")
+    
+    with pytest.raises(ValueError):
+        ContainerManager(
             workspace_dir=str(workspace),
             env_file=str(env_file),
-            sample_env_file=str(sample_env),
+            sample_env_file=str(shared_sample_env),
         )
-        
-        assert len(manager.env_vars) == 2
-        assert manager.env_vars["TEST_VAR1"] == "value1"
-        assert manager.env_vars["TEST_VAR2"] == "value2"
 
 
-def test_container_manager_invalid_env_file_raises_error():
-    """Test that invalid .env file raises ValueError."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        workspace = Path(tmpdir) / "workspace"
-        workspace.mkdir()
-        
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text("VAR1=value1\nINVALID CONTENT\n")
-        
-        sample_env = Path(tmpdir) / "sample.env"
-        sample_env.write_text("# Sample\n")
-        
-        with pytest.raises(ValueError):
-            ContainerManager(
-                workspace_dir=str(workspace),
-                env_file=str(env_file),
-                sample_env_file=str(sample_env),
-            )
-
-
-def test_script_content_does_not_include_env_exports():
+def test_script_content_does_not_include_env_exports(tmp_path, shared_sample_env):
     """Scripts should not persist env vars; they are injected at exec time."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        workspace = Path(tmpdir) / "workspace"
-        workspace.mkdir()
-
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text("TEST_VAR=test_value\n")
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
 
-        sample_env = Path(tmpdir) / "sample.env"
-        sample_env.write_text("# Sample\n")
+    env_file = tmp_path / ".env"
+    env_file.write_text("TEST_VAR=test_value\n")
 
-        manager = ContainerManager(
-            workspace_dir=str(workspace),
-            env_file=str(env_file),
-            sample_env_file=str(sample_env),
-        )
+    manager = ContainerManager(
+        workspace_dir=str(workspace),
+        env_file=str(env_file),
+        sample_env_file=str(shared_sample_env),
+    )
 
-        content = manager._build_script_content("echo 'hello'")
-        assert "export TEST_VAR" not in content
-        assert content.startswith("#!/bin/bash\n")
-        assert "echo 'hello'" in content
+    content = manager._build_script_content("echo 'hello'")
+    assert "export TEST_VAR" not in content
+    assert content.startswith("#!/bin/bash\n")
+    assert "echo 'hello'" in content
 
-        # Env should be present in composed exec environment instead
-        env = manager._compose_exec_env()
-        assert env.get("TEST_VAR") == "test_value"
+    # Env should be present in composed exec environment instead
+    env = manager._compose_exec_env()
+    assert env.get("TEST_VAR") == "test_value"
 
 
 def test_is_github_available_without_token(temp_workspace, temp_env_files):
@@ -305,25 +271,21 @@ def test_is_github_available_without_token(temp_workspace, temp_env_files):
     assert not manager.is_github_available()
 
 
-def test_is_github_available_with_token(temp_workspace):
+def test_is_github_available_with_token(tmp_path, shared_sample_env):
     """Test that GitHub is available with token."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        workspace = Path(tmpdir) / "workspace"
-        workspace.mkdir()
-        
-        env_file = Path(tmpdir) / ".env"
-        env_file.write_text("GITHUB_PERSONAL_ACCESS_TOKEN=test_token\n")
-        
-        sample_env = Path(tmpdir) / "sample.env"
-        sample_env.write_text("# Sample\n")
-        
-        manager = ContainerManager(
-            workspace_dir=str(workspace),
-            env_file=str(env_file),
-            sample_env_file=str(sample_env),
-        )
-        
-        assert manager.is_github_available()
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    
+    env_file = tmp_path / ".env"
+    env_file.write_text("GITHUB_PERSONAL_ACCESS_TOKEN=test_token\n")
+    
+    manager = ContainerManager(
+        workspace_dir=str(workspace),
+        env_file=str(env_file),
+        sample_env_file=str(shared_sample_env),
+    )
+    
+    assert manager.is_github_available()
 
 
 def test_list_repositories_without_github_available(temp_workspace, temp_env_files):
@@ -354,3 +316,49 @@ def test_clone_repository_without_github_available(temp_workspace, temp_env_file
     assert "GitHub CLI is not available" in output
 
 
+class _RecordingContainer:
+    """Records exec_run keyword arguments and answers with canned demuxed output."""
+
+    def __init__(self):
+        self.exec_calls = []
+
+    def exec_run(self, **kwargs):
+        self.exec_calls.append(kwargs)
+        return SimpleNamespace(exit_code=3, output=(b"out\n", b"err\n"))
+
+
+@pytest.mark.parametrize("workdir", [None, "/workspace/proj"])
+def test_execute_argv_runs_argv_directly(temp_workspace, temp_env_files, workdir):
+    """execute_argv passes argv to exec as-is: no login shell, no script, env only at exec time."""
+    env_file, sample_env = temp_env_files
+    manager = ContainerManager(
+        workspace_dir=temp_workspace,
+        env_file=str(env_file),
+        sample_env_file=str(sample_env),
+    )
+    fake = _RecordingContainer()
+    manager.container = fake
+
+    code, out = manager.execute_argv(["git", "status", "a b"], "t1", workdir=workdir, extra_env={"EXTRA": "1"})
+
+    assert (code, out) == (3, "out\nerr\n")
+    (call,) = fake.exec_calls
+    assert call["cmd"] == ["git", "status", "a b"]
+    assert call["user"] == "ubuntu"
+    assert call["demux"] is True
+    assert call.get("workdir") == workdir
+    assert call["environment"] == manager._compose_exec_env({"EXTRA": "1"})
+    assert call["environment"]["EXTRA"] == "1"
+    assert not list((Path(temp_workspace) / ".agent" / "tmp_scripts").glob("task_*.sh"))
+
+
+def test_execute_argv_rejects_empty_argv(temp_workspace, temp_env_files):
+    env_file, sample_env = temp_env_files
+    manager = ContainerManager(
+        workspace_dir=temp_workspace,
+        env_file=str(env_file),
+        sample_env_file=str(sample_env),
+    )
+    manager.container = _RecordingContainer()
+    with pytest.raises(ValueError):
+        manager.execute_argv([], "t2")
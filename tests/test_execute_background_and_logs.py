@@ -1,57 +1,38 @@
-import json
 import pytest
 
+from effective_potato import server
 
-class FakeContainerManager:
-    def __init__(self):
-        self.started = []
-        self.execs = []
-
-    def start_background_task(self, command: str, task_id: str, extra_env=None):
-        self.started.append({"cmd": command, "task_id": task_id, "env": extra_env})
-        return {"task_id": task_id, "exit_code": 0}
-
-    def execute_command(self, command: str, task_id: str, extra_env=None):
-        self.execs.append({"cmd": command, "task_id": task_id})
-        # Simulate reading logs
-        if command.startswith("test -f '/workspace/.agent/tmp_scripts/task_") and "tail -n" in command:
-            return 0, "last line"
-        if command.startswith("test -f '/workspace/.agent/tmp_scripts/task_") and "cat '" in command:
-            return 0, "line1\nline2\n"
-        return 0, "OK"
-
-
-@pytest.mark.asyncio
-async def test_workspace_execute_command_background(monkeypatch):
-    from effective_potato import server
-
-    fake = FakeContainerManager()
-    orig = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        res = await server.call_tool("potato_execute_command", {"command": "sleep 5", "background": True})
-        payload = json.loads(res[0].text)
-        assert payload["task_id"]
-        assert any(s["cmd"] == "sleep 5" for s in fake.started)
-    finally:
-        server.container_manager = orig
-
-
-@pytest.mark.asyncio
-async def test_workspace_task_output_tail_and_full(monkeypatch):
-    from effective_potato import server
-
-    fake = FakeContainerManager()
-    orig = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        # Tail last line
-        res = await server.call_tool("potato_task_output", {"task_id": "abc", "tail": 1})
-        payload = json.loads(res[0].text)
-        assert payload["content"].strip() == "last line"
-        # Full content
-        res = await server.call_tool("potato_task_output", {"task_id": "abc", "tail": 0})
-        payload = json.loads(res[0].text)
-        assert payload["content"].splitlines() == ["line1", "line2"]
-    finally:
-        server.container_manager = orig
+
+def _read_log(command: str):
+    # Simulate reading logs
+    if command.startswith("test -f /workspace/.agent/tmp_scripts/task_") and "tail -n" in command:
+        return 0, "last line"
+    if command.startswith("test -f /workspace/.agent/tmp_scripts/task_") and " cat " in command:
+        return 0, "line1\nline2\n"
+    return 0, "OK"
+
+
+async def test_workspace_execute_command_background(fake_cm):
+    res = await server.call_tool("potato_execute_command", {"command": "sleep 5", "background": True})
+    payload = server._loads(res[0].text)
+    assert payload["task_id"]
+    assert any(s["cmd"] == "sleep 5" for s in fake_cm.started)
+
+
+async def test_workspace_task_output_tail_and_full(fake_cm):
+    fake_cm.script = _read_log
+    # Tail last line
+    res = await server.call_tool("potato_task_output", {"task_id": "abc", "tail": 1})
+    payload = server._loads(res[0].text)
+    assert payload["content"].strip() == "last line"
+    # Full content
+    res = await server.call_tool("potato_task_output", {"task_id": "abc", "tail": 0})
+    payload = server._loads(res[0].text)
+    assert payload["content"].splitlines() == ["line1", "line2"]
+
+
+@pytest.mark.parametrize("tool", ["potato_task_output", "potato_task_status", "potato_task_kill"])
+async def test_task_tools_reject_non_hex_task_ids(fake_cm, tool):
+    with pytest.raises(ValueError, match="hex task id"):
+        await server.call_tool(tool, {"task_id": "x'; rm -rf ~; '"})
+    assert fake_cm.last_cmd is None
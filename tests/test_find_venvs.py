@@ -1,30 +1,99 @@
+import subprocess
+
 import pytest
 
+from effective_potato import server
+
+
+async def test_find_venvs_builds_expected_command(fake_cm):
+    res = await server.call_tool("potato_find_venvs", {"path": "projects"})
+    assert isinstance(res, list) and res
+    cmd = fake_cm.last_cmd
+    assert cmd is not None
+    # Should search under projects and not exclude venv directories, but prune heavy dirs and cap depth
+    assert "cd /workspace && cd -- projects && find . -maxdepth 5 \\( -name .agent -o -name .git " in cmd
+    assert "-o -name node_modules -o -name target \\) -prune -o \\( -type d \\( -name '*venv*' -o -name '*_env*' \\) -o -path '*/bin/activate' \\) -print" in cmd
+
+
+async def test_find_venvs_scans_host_workspace_in_process(tmp_path, fake_cm):
+    (tmp_path / "projects" / "app" / ".venv" / "bin").mkdir(parents=True)
+    (tmp_path / "projects" / "app" / ".venv" / "bin" / "activate").write_text("")
+    (tmp_path / "projects" / "tool" / "py" / "bin").mkdir(parents=True)
+    (tmp_path / "projects" / "tool" / "py" / "bin" / "activate").write_text("")
+    (tmp_path / "projects" / ".git" / "venv").mkdir(parents=True)
+
+    fake_cm.workspace_dir = str(tmp_path)
+    res = await server.call_tool("potato_find_venvs", {"path": "projects"})
+    data = server._loads(res[0].text)
+    # No container exec when the workspace is reachable on the host
+    assert fake_cm.last_cmd is None
+    assert data["venv_roots"] == ["./app/.venv", "./tool/py"]
+
+
+async def test_find_venvs_scans_path_workspace_dir(tmp_path, fake_cm):
+    # ContainerManager.workspace_dir is a Path, not a str
+    (tmp_path / "app" / ".venv").mkdir(parents=True)
+
+    fake_cm.workspace_dir = tmp_path
+    res = await server.call_tool("potato_find_venvs", {"path": "."})
+    data = server._loads(res[0].text)
+    assert fake_cm.last_cmd is None
+    assert data["venv_roots"] == ["./app/.venv"]
+
+
+async def test_find_venvs_host_scan_rejects_paths_outside_workspace(tmp_path, fake_cm):
+    ws = tmp_path / "ws"
+    ws.mkdir()
+    (tmp_path / "outside" / ".venv").mkdir(parents=True)
+
+    fake_cm.workspace_dir = str(ws)
+    with pytest.raises(ValueError, match="inside /workspace"):
+        await server.call_tool("potato_find_venvs", {"path": "../outside"})
+    with pytest.raises(ValueError):
+        await server.call_tool("potato_find_venvs", {"path": "projects/../../.."})
+    assert fake_cm.last_cmd is None
+
+
+async def test_find_venvs_missing_host_subpath_skips_exec(tmp_path, fake_cm):
+    fake_cm.workspace_dir = str(tmp_path)
+    res = await server.call_tool("potato_find_venvs", {"path": "does-not-exist"})
+    data = server._loads(res[0].text)
+    assert fake_cm.last_cmd is None
+    assert data["items"] == [] and data["venv_roots"] == []
+
+
+async def test_find_venvs_host_scan_skips_heavy_dirs_and_caps_depth(tmp_path, fake_cm):
+    (tmp_path / "app" / "node_modules" / "pkg" / ".venv").mkdir(parents=True)
+    (tmp_path / "app" / ".venv").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "c" / "d" / "e" / "f" / ".venv").mkdir(parents=True)
+
+    fake_cm.workspace_dir = str(tmp_path)
+    res = await server.call_tool("potato_find_venvs", {"path": "."})
+    data = server._loads(res[0].text)
+    assert data["venv_roots"] == ["./app/.venv"]
+
+
+async def test_find_venvs_container_find_matches_host_scan(tmp_path, fake_cm):
+    (tmp_path / "app" / "node_modules" / "pkg" / ".venv").mkdir(parents=True)
+    (tmp_path / "app" / ".venv" / "bin").mkdir(parents=True)
+    (tmp_path / "app" / ".venv" / "bin" / "activate").write_text("")
+    (tmp_path / "app" / "build" / "venv").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "c" / "d" / "e" / "f" / ".venv").mkdir(parents=True)
+
+    fake_cm.workspace_dir = str(tmp_path)
+    host = server._loads((await server.call_tool("potato_find_venvs", {"path": "."}))[0].text)
+
+    # Run the container command with the real find against the same tree
+    def _run(cmd: str) -> tuple[int, str]:
+        proc = subprocess.run(
+            ["bash", "-c", cmd.replace("cd /workspace", f"cd {tmp_path}", 1)],
+            capture_output=True, text=True,
+        )
+        return proc.returncode, proc.stdout
 
-class FakeContainerManager:
-    def __init__(self):
-        self.last_command = None
-        self.last_task_id = None
-
-    def execute_command(self, command: str, task_id: str):
-        self.last_command = command
-        self.last_task_id = task_id
-        return 0, "./proj/.venv/\n./proj2/env/bin/activate\n"
-
-
-@pytest.mark.asyncio
-async def test_find_venvs_builds_expected_command():
-    from effective_potato import server
-
-    fake = FakeContainerManager()
-    orig_cm = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        res = await server.call_tool("potato_find_venvs", {"path": "projects"})
-        assert isinstance(res, list) and res
-        cmd = fake.last_command
-        assert cmd is not None
-        # Should search under projects and not exclude venv directories, but prune .git and .agent
-        assert "cd /workspace && cd -- 'projects' && find . \\(-name .git -o -name .agent\\) -prune -o \\( -type d \\( -name '*venv*' -o -name '*_env*' \\) -o -path '*/bin/activate' \\) -print" in cmd
-    finally:
-        server.container_manager = orig_cm
+    fake_cm.workspace_dir = None
+    fake_cm.script = _run
+    container = server._loads((await server.call_tool("potato_find_venvs", {"path": "."}))[0].text)
+    assert fake_cm.last_cmd is not None
+    assert container["venv_roots"] == host["venv_roots"] == ["./app/.venv"]
+    assert sorted(container["items"]) == sorted(host["items"])
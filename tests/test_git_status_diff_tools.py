@@ -1,49 +1,63 @@
-import json
-import pytest
-
-
-class FakeContainerManager:
-    def __init__(self):
-        self.last_cmd = None
-
-    def execute_command(self, command: str, task_id: str, extra_env=None):
-        self.last_cmd = command
-        return 0, "OK"
-
-
-@pytest.mark.asyncio
-async def test_workspace_git_status_porcelain(monkeypatch):
-    from effective_potato import server
-
-    fake = FakeContainerManager()
-    orig = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        res = await server.call_tool("potato_git_status", {"repo_path": "proj"})
-        assert isinstance(res, list) and res
-        assert "cd /workspace && cd -- 'proj' && git status --porcelain=v1 -b" in fake.last_cmd
-        payload = json.loads(res[0].text)
-        assert payload["exit_code"] == 0
-    finally:
-        server.container_manager = orig
-
-
-@pytest.mark.asyncio
-async def test_workspace_git_diff_staged_name_only_with_paths(monkeypatch):
-    from effective_potato import server
-
-    fake = FakeContainerManager()
-    orig = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        res = await server.call_tool(
-            "potato_git_diff",
-            {"repo_path": "proj", "staged": True, "name_only": True, "unified": 0, "paths": ["src/app.py", "README.md"]},
-        )
-        assert isinstance(res, list) and res
-        cmd = fake.last_cmd
-        assert "cd /workspace && cd -- 'proj' && git diff --cached --name-only --unified=0 -- 'src/app.py' 'README.md'" in cmd
-        payload = json.loads(res[0].text)
-        assert payload["exit_code"] == 0
-    finally:
-        server.container_manager = orig
+import time
+
+from effective_potato import server
+
+
+async def test_workspace_git_status_porcelain(fake_cm):
+    res = await server.call_tool("potato_git_status", {"repo_path": "proj"})
+    assert isinstance(res, list) and res
+    assert "git -C /workspace/proj --no-optional-locks status --porcelain=v1 -b" in fake_cm.last_cmd
+    payload = server._loads(res[0].text)
+    assert payload["exit_code"] == 0
+
+
+async def test_workspace_git_diff_staged_name_only_with_paths(fake_cm):
+    res = await server.call_tool(
+        "potato_git_diff",
+        {"repo_path": "proj", "staged": True, "name_only": True, "unified": 0, "paths": ["src/app.py", "README.md"]},
+    )
+    assert isinstance(res, list) and res
+    cmd = fake_cm.last_cmd
+    assert "git -C /workspace/proj --no-optional-locks diff --cached --name-only -- src/app.py README.md" in cmd
+    payload = server._loads(res[0].text)
+    assert payload["exit_code"] == 0
+
+    await server.call_tool("potato_git_diff", {"repo_path": "proj", "unified": 1, "paths": ["src/app.py"]})
+    assert "git -C /workspace/proj --no-optional-locks diff --unified=1 -- src/app.py" in fake_cm.last_cmd
+
+
+async def test_workspace_git_status_timeout_payload(fake_cm):
+    def slow(cmd):
+        time.sleep(0.3)
+        return fake_cm.result
+
+    fake_cm.script = slow
+    res = await server.call_tool("potato_git_status", {"repo_path": "proj", "timeout_seconds": 0})
+    payload = server._loads(res[0].text)
+    assert payload["exit_code"] is None
+    assert payload["timeout_seconds"] == 0
+    assert "still running" in payload["message"]
+    assert payload["hint"]
+
+
+async def test_workspace_git_add_runs_argv_in_repo_dir(fake_cm):
+    await server.call_tool("potato_git_add", {"repo_path": "proj", "paths": ["a b.py"]})
+    assert fake_cm.argv_calls == [(["git", "add", "--", "a b.py"], "/workspace/proj", None)]
+    assert fake_cm.last_cmd == "cd -- /workspace/proj && git add -- 'a b.py'"
+
+
+def test_timeout_text_keeps_digits_and_quotes_in_the_message():
+    payload = server._loads(server._timeout_text({"timeout_seconds": 7}, 'step -719304581 "x" still running', "Wait."))
+    assert list(payload) == ["exit_code", "timeout_seconds", "message", "hint"]
+    assert payload["exit_code"] is None and payload["timeout_seconds"] == 7
+    assert payload["message"] == 'step -719304581 "x" still running'
+
+
+async def test_workspace_git_add_timeout_names_git_add(fake_cm):
+    def slow(cmd):
+        time.sleep(0.3)
+        return fake_cm.result
+
+    fake_cm.script = slow
+    res = await server.call_tool("potato_git_add", {"repo_path": "proj", "timeout_seconds": 0})
+    assert server._loads(res[0].text)["message"].startswith("git add still running")
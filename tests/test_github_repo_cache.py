@@ -0,0 +1,49 @@
+import json
+
+from effective_potato import server
+
+
+class FakeContainerManager:
+    def __init__(self):
+        self.calls = 0
+
+    def is_github_available(self):
+        return True
+
+    def execute_command(self, command: str, task_id: str, extra_env=None):
+        self.calls += 1
+        return 0, json.dumps({"name": "proj", "defaultBranchRef": {"name": "main"}})
+
+
+async def test_github_get_repository_reuses_recent_result(monkeypatch):
+    fake = FakeContainerManager()
+    monkeypatch.setattr(server, "container_manager", fake)
+    monkeypatch.setattr(server, "_gh_repo_cache", {})
+    first = await server.call_tool("github_get_repository", {"owner": "o", "repo": "proj"})
+    second = await server.call_tool("github_get_repository", {"owner": "o", "repo": "proj"})
+    assert fake.calls == 1
+    assert first[0].text == second[0].text
+    assert server._loads(second[0].text)["repository"]["name"] == "proj"
+
+    # Expired entries are refetched
+    monkeypatch.setattr(server, "_GH_REPO_CACHE_TTL_S", 0.0)
+    await server.call_tool("github_get_repository", {"owner": "o", "repo": "proj"})
+    assert fake.calls == 2
+
+
+async def test_github_get_repository_error_text_is_not_cached(monkeypatch):
+    class ErrorContainerManager(FakeContainerManager):
+        def execute_command(self, command: str, task_id: str, extra_env=None):
+            self.calls += 1
+            return 1, "GraphQL: Could not resolve to a Repository"
+
+    fake = ErrorContainerManager()
+    monkeypatch.setattr(server, "container_manager", fake)
+    monkeypatch.setattr(server, "_gh_repo_cache", {})
+    res = await server.call_tool("github_get_repository", {"owner": "o", "repo": "missing"})
+    data = server._loads(res[0].text)
+    assert data["exit_code"] == 1
+    assert data["output"].startswith("GraphQL:")
+    assert "repository" not in data
+    await server.call_tool("github_get_repository", {"owner": "o", "repo": "missing"})
+    assert fake.calls == 2
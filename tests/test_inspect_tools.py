@@ -1,10 +1,9 @@
 import pytest
 
+from effective_potato import server
 
-@pytest.mark.asyncio
-async def test_list_tools_includes_core_tools_and_no_review_tools():
-    from effective_potato import server
 
+async def test_list_tools_includes_core_tools_and_no_review_tools():
     tools = await server.list_tools()
     names = {t.name for t in tools}
 
@@ -12,3 +11,22 @@ async def test_list_tools_includes_core_tools_and_no_review_tools():
     assert "potato_screenshot" in names
     assert "potato_find_venvs" in names
     assert not any(n.startswith("review_") for n in names)
+
+
+async def test_every_published_tool_has_a_handler():
+    tools = await server.list_tools()
+    names = {t.name for t in tools}
+    assert names <= set(server._TOOL_HANDLERS)
+
+
+async def test_unpublished_tools_are_rejected_as_unknown(monkeypatch):
+    class NoGhContainerManager:
+        def is_github_available(self):
+            return False
+
+    monkeypatch.setattr(server, "container_manager", NoGhContainerManager())
+    names = {t.name for t in await server.list_tools()}
+    for name in ["potato_workspace_multi_tool_pipeline", "github_get_repository", "no_such_tool"]:
+        assert name not in names
+        with pytest.raises(ValueError, match="Unknown tool"):
+            await server.call_tool(name, {})
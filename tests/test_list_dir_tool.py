@@ -1,10 +1,9 @@
 import pytest
 
+from effective_potato import server
 
-@pytest.mark.asyncio
-async def test_workspace_list_dir_not_exposed():
-    from effective_potato import server
 
+async def test_workspace_list_dir_not_exposed():
     tools = await server.list_tools()
     names = {t.name for t in tools}
     assert "potato_list_dir" not in names
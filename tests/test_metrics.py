@@ -0,0 +1,66 @@
+import threading
+
+from effective_potato import web
+
+
+def test_recorded_metrics_are_rendered():
+    web.record_tool_metric("unit_test_tool", 12)
+    web.record_tool_metric("unit_test_tool", 30)
+    web.record_tool_metric("unit_test_tool", -5)
+    text = web.render_metrics_text()
+    assert 'effective_potato_tool_calls_total{tool="unit_test_tool"} 3' in text
+    assert 'effective_potato_tool_duration_ms_sum{tool="unit_test_tool"} 42' in text
+    assert text.startswith("effective_potato_up 1\n")
+
+
+def test_counts_from_finished_threads_are_summed():
+    def _worker():
+        for _ in range(100):
+            web.record_tool_metric("unit_test_threads", 2)
+
+    threads = [threading.Thread(target=_worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    web.record_tool_metric("unit_test_threads", 2)
+    text = web.render_metrics_text()
+    assert 'effective_potato_tool_calls_total{tool="unit_test_threads"} 401' in text
+    assert 'effective_potato_tool_duration_ms_sum{tool="unit_test_threads"} 802' in text
+
+
+def test_rendered_text_is_reused_until_a_new_sample():
+    web.record_tool_metric("unit_test_cache", 1)
+    first = web.render_metrics_text()
+    assert web.render_metrics_text() is first
+    web.record_tool_metric("unit_test_cache", 1)
+    assert 'effective_potato_tool_calls_total{tool="unit_test_cache"} 2' in web.render_metrics_text()
+
+
+def test_tools_are_rendered_in_name_order():
+    for name in ["unit_test_order_c", "unit_test_order_a", "unit_test_order_b"]:
+        web.record_tool_metric(name, 1)
+    lines = [ln for ln in web.render_metrics_text().splitlines() if "unit_test_order_" in ln]
+    assert lines == sorted(lines, key=lambda ln: ("duration" in ln, ln))
+    assert len(lines) == 6
+
+
+def test_tool_label_values_are_escaped():
+    web.record_tool_metric('unit_test_"quoted"\\tool', 1)
+    text = web.render_metrics_text()
+    assert 'effective_potato_tool_calls_total{tool="unit_test_\\"quoted\\"\\\\tool"} 1' in text
+
+
+def test_finished_thread_shards_are_folded_into_the_base():
+    def _worker():
+        web.record_tool_metric("unit_test_fold", 3)
+
+    for _ in range(20):
+        t = threading.Thread(target=_worker)
+        t.start()
+        t.join()
+    text = web.render_metrics_text()
+    assert 'effective_potato_tool_calls_total{tool="unit_test_fold"} 20' in text
+    assert 'effective_potato_tool_duration_ms_sum{tool="unit_test_fold"} 60' in text
+    live = {t.ident for t in threading.enumerate()}
+    assert set(web._shards) <= live
@@ -69,7 +69,7 @@ def run_server(port, ready_evt):
     httpd.serve_forever()
 
 
-def test_export_script(tmp_path, monkeypatch):
+def test_export_script(tmp_path):
     # start mock server
     import socket
     s = socket.socket()
@@ -101,7 +101,7 @@ def test_export_script(tmp_path, monkeypatch):
     assert files, "no export file produced"
 
 
-def test_import_script_alt_name_and_delete(tmp_path, monkeypatch):
+def test_import_script_alt_name_and_delete(tmp_path):
     # start mock server with fresh state
     MockHandler.models = [
         {"id": "1", "name": "effective-potato", "label": "effective-potato"},
@@ -1,4 +1,4 @@
-import pytest
+from effective_potato import server
 
 
 class FakeContainerManager:
@@ -11,46 +11,54 @@ class FakeContainerManager:
         return 0, "OK"
 
 
-@pytest.mark.asyncio
 async def test_workspace_python_run_module_builds_command(monkeypatch):
-    from effective_potato import server
-
     fake = FakeContainerManager()
-    orig_cm = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        args = {
-            "venv_path": "proj/.venv",
-            "module": "http.server",
-            "args": ["--bind", "127.0.0.1", "--help"],
-        }
-        res = await server.call_tool("potato_python_run_module", args)
-        assert isinstance(res, list) and res
-        cmd = fake.calls[-1]["cmd"]
-        assert cmd.startswith("/workspace/proj/.venv/bin/python -m http.server")
-        assert "--bind" in cmd and "127.0.0.1" in cmd
-    finally:
-        server.container_manager = orig_cm
-
-
-@pytest.mark.asyncio
-async def test_workspace_python_run_script_builds_command(monkeypatch):
-    from effective_potato import server
+    monkeypatch.setattr(server, "container_manager", fake)
+    args = {
+        "venv_path": "proj/.venv",
+        "module": "http.server",
+        "args": ["--bind", "127.0.0.1", "--help"],
+    }
+    res = await server.call_tool("potato_python_run_module", args)
+    assert isinstance(res, list) and res
+    cmd = fake.calls[-1]["cmd"]
+    assert cmd.startswith("/workspace/proj/.venv/bin/python -m http.server")
+    assert "--bind" in cmd and "127.0.0.1" in cmd
+
 
+async def test_workspace_python_run_script_builds_command(monkeypatch):
     fake = FakeContainerManager()
-    orig_cm = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        args = {
-            "venv_path": "proj/.venv",
-            "script_path": "proj/app.py",
-            "args": ["--version"],
-        }
-        res = await server.call_tool("potato_python_run_script", args)
-        assert isinstance(res, list) and res
-        cmd = fake.calls[-1]["cmd"]
-        # Expect python path under the venv and absolute /workspace path for script
-        assert cmd.startswith("/workspace/proj/.venv/bin/python '/workspace/proj/app.py'")
-        assert "--version" in cmd
-    finally:
-        server.container_manager = orig_cm
+    monkeypatch.setattr(server, "container_manager", fake)
+    args = {
+        "venv_path": "proj/.venv",
+        "script_path": "proj/app.py",
+        "args": ["--version"],
+    }
+    res = await server.call_tool("potato_python_run_script", args)
+    assert isinstance(res, list) and res
+    cmd = fake.calls[-1]["cmd"]
+    # Expect python path under the venv and absolute /workspace path for script
+    assert cmd.startswith("/workspace/proj/.venv/bin/python /workspace/proj/app.py")
+    assert "--version" in cmd
+
+
+class FakeArgvContainerManager(FakeContainerManager):
+    def execute_argv(self, argv, task_id, *, workdir=None, extra_env=None):
+        self.calls.append({"argv": list(argv), "workdir": workdir, "task_id": task_id})
+        return 0, "OK"
+
+
+async def test_workspace_python_run_script_uses_argv_exec(monkeypatch):
+    fake = FakeArgvContainerManager()
+    monkeypatch.setattr(server, "container_manager", fake)
+    args = {
+        "venv_path": "proj/.venv",
+        "script_path": "proj/it's.py",
+        "args": ["a b", "--flag"],
+    }
+    res = await server.call_tool("potato_python_run_script", args)
+    assert isinstance(res, list) and res
+    # Arguments are passed verbatim; no shell quoting involved
+    assert fake.calls[-1]["argv"] == [
+        "/workspace/proj/.venv/bin/python", "/workspace/proj/it's.py", "a b", "--flag",
+    ]
@@ -1,5 +1,4 @@
-import json
-import pytest
+from effective_potato import server
 
 
 class FakeContainerManager:
@@ -11,37 +10,32 @@ class FakeContainerManager:
         return 0, "OK"
 
 
-@pytest.mark.asyncio
 async def test_python_check_syntax_builds_expected_command(monkeypatch):
-    from effective_potato import server
     fake = FakeContainerManager()
-    orig = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        res = await server.call_tool(
-            "potato_python_check_syntax",
-            {"venv_path": ".venv", "source_path": "src/app.py"},
-        )
-        payload = json.loads(res[0].text)
-        assert payload["exit_code"] == 0
-        assert "source '/workspace/.venv/bin/activate' && python -m py_compile '/workspace/src/app.py'" in fake.last_cmd
-    finally:
-        server.container_manager = orig
-
-
-@pytest.mark.asyncio
+    monkeypatch.setattr(server, "container_manager", fake)
+    res = await server.call_tool(
+        "potato_python_check_syntax",
+        {"venv_path": ".venv", "source_path": "src/app.py"},
+    )
+    payload = server._loads(res[0].text)
+    assert payload["exit_code"] == 0
+    assert "source /workspace/.venv/bin/activate && python -m py_compile /workspace/src/app.py" in fake.last_cmd
+
+
 async def test_workspace_pytest_run_builds_expected_command(monkeypatch):
-    from effective_potato import server
     fake = FakeContainerManager()
-    orig = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        res = await server.call_tool(
-            "potato_pytest_run",
-            {"venv_path": "venv", "args": ["-q", "tests/test_example.py"]},
-        )
-        payload = json.loads(res[0].text)
-        assert payload["exit_code"] == 0
-        assert "source '/workspace/venv/bin/activate' && pytest '-q' 'tests/test_example.py'" in fake.last_cmd
-    finally:
-        server.container_manager = orig
+    monkeypatch.setattr(server, "container_manager", fake)
+    res = await server.call_tool(
+        "potato_pytest_run",
+        {"venv_path": "venv", "args": ["-q", "tests/test_example.py"]},
+    )
+    payload = server._loads(res[0].text)
+    assert payload["exit_code"] == 0
+    assert "source /workspace/venv/bin/activate && pytest -q tests/test_example.py" in fake.last_cmd
+
+
+async def test_workspace_pytest_run_quotes_venv_path(monkeypatch):
+    fake = FakeContainerManager()
+    monkeypatch.setattr(server, "container_manager", fake)
+    await server.call_tool("potato_pytest_run", {"venv_path": "it's venv", "args": ["-q"]})
+    assert fake.last_cmd == "source '/workspace/it'\"'\"'s venv/bin/activate' && pytest -q"
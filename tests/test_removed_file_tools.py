@@ -1,14 +1,14 @@
 import pytest
 
+from effective_potato import server
+
 
-@pytest.mark.asyncio
 async def test_file_review_and_search_tools_not_exposed():
     """The server is intended to be used by coding agents that already provide
     filesystem primitives (glob/list/read/search/write/applyDiff). effective-potato
     should not publish overlapping tools.
     """
 
-    from effective_potato import server
 
     tools = await server.list_tools()
     names = {t.name for t in tools}
@@ -29,10 +29,7 @@ async def test_file_review_and_search_tools_not_exposed():
             await server.call_tool(tool_name, {})
 
 
-@pytest.mark.asyncio
 async def test_review_prefixed_file_tools_not_allowed():
-    from effective_potato import server
-
     with pytest.raises(ValueError):
         await server.call_tool("review_workspace_read_file", {"path": "README.md"})
 
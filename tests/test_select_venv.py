@@ -1,10 +1,7 @@
-import pytest
+from effective_potato import server
 
 
-@pytest.mark.asyncio
 async def test_workspace_select_venv_heuristics_and_shape():
-    from effective_potato import server
-
     candidates = [
         "projects/app/.venv",
         "projects/other/env",
@@ -16,10 +13,7 @@ async def test_workspace_select_venv_heuristics_and_shape():
     res = await server.call_tool("potato_select_venv", {"paths": candidates})
     # Response is a list of TextContent items with JSON payload
     assert isinstance(res, list) and res
-    payload_text = res[0].text
-    import json
-
-    data = json.loads(payload_text)
+    data = server._loads(res[0].text)
     assert "best" in data and "candidates" in data
     assert set(data["candidates"]) == set(candidates)
     # Expect one of the .venv paths to be chosen; shallower path should win among .venv
@@ -2,6 +2,7 @@
 
 import os
 import pytest
+from effective_potato import server
 from effective_potato.server import initialize_server, cleanup_server
 
 
@@ -39,8 +40,6 @@ def test_server_initialization_and_cleanup():
 
 def test_server_has_required_functions():
     """Test that server module has all required functions."""
-    from effective_potato import server
-    
     assert hasattr(server, 'initialize_server')
     assert hasattr(server, 'cleanup_server')
     assert hasattr(server, 'main')
@@ -48,3 +47,37 @@ def test_server_has_required_functions():
     assert callable(server.initialize_server)
     assert callable(server.cleanup_server)
     assert callable(server.main)
+
+
+class _FlakyRestartCM:
+    """Container that stays down until ensure_container_alive has been called `failures` + 1 times."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = 0
+        self.running = False
+
+    def is_container_running(self) -> bool:
+        return self.running
+
+    def ensure_container_alive(self) -> bool:
+        self.attempts += 1
+        if self.attempts == 1:
+            raise RuntimeError("docker daemon busy")
+        if self.attempts <= self.failures:
+            return False
+        self.running = True
+        return True
+
+    def get_container_id(self) -> str:
+        return "abc123"
+
+
+def test_watchdog_restart_retries_with_backoff_until_up(monkeypatch):
+    """A failed restart is retried (the dead container emits no further events to trigger one)."""
+    sleeps: list[float] = []
+    monkeypatch.setattr(server.time, "sleep", sleeps.append)
+    cm = _FlakyRestartCM(failures=2)
+    server._restart_until_up(cm, max_backoff=1.5)
+    assert cm.attempts == 3 and cm.running
+    assert sleeps == [1.0, 1.5]
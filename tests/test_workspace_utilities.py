@@ -1,5 +1,7 @@
 import pytest
 
+from effective_potato import server
+
 
 class FakeContainerManager:
     def __init__(self):
@@ -10,20 +12,20 @@ class FakeContainerManager:
         return 0, "OK"
 
 
-@pytest.mark.asyncio
 async def test_screenshot_schema_validation_defaults(monkeypatch):
-    from effective_potato import server
-
     class FakeCM(FakeContainerManager):
         pass
 
     fake = FakeCM()
-    orig_cm = getattr(server, "container_manager", None)
-    try:
-        server.container_manager = fake
-        # Missing fields should be acceptable due to defaults
-        res = await server.call_tool("potato_screenshot", {})
-        assert isinstance(res, list) and res
-        assert "xfce4-screenshooter -f -s" in fake.last_cmd
-    finally:
-        server.container_manager = orig_cm
+    monkeypatch.setattr(server, "container_manager", fake)
+    # Missing fields should be acceptable due to defaults
+    res = await server.call_tool("potato_screenshot", {})
+    assert isinstance(res, list) and res
+    assert "xfce4-screenshooter -f -s" in fake.last_cmd
+
+
+def test_to_rel_rejects_workspace_root_with_trailing_newline():
+    assert server._to_rel("/workspace") == "."
+    assert server._to_rel("/workspace/proj") == "proj"
+    with pytest.raises(ValueError):
+        server._to_rel("/workspace\n")